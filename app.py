@@ -10,18 +10,26 @@ Usage:
 """
 
 import asyncio
+import csv
+import hashlib
 import json
+import multiprocessing
 import os
-import threading
 import time
 import xml.etree.ElementTree as ET
-from collections import defaultdict
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from operator import itemgetter, sub
 from datetime import datetime, timedelta
+from functools import lru_cache
+from io import BytesIO, TextIOWrapper
 from pathlib import Path
 
 import httpx
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, FileResponse
+import orjson
+from fastapi import FastAPI, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from config import (
@@ -29,52 +37,191 @@ from config import (
     EGAUGE_USER,
     EGAUGE_PASSWORD,
     EXCLUDE_REGISTERS,
-    get_tou_period,
     get_rate,
+    HOUR_TO_TOU,
+    tou_table_for,
     is_summer,
     WINTER_RATES,
     SUMMER_RATES,
     is_solar_enabled,
-    get_config,
+    SOLAR_ENABLED,
+    PLAN_NAME,
+)
+from solar_integration import (
+    HA_URL,
+    HA_ENTITY_TO_KEY,
+    get_ha_token,
+    build_hourly_solar_data,
+    blend_egauge_with_solar,
+    get_export_credit,
+)
+from egauge_weekly_analysis import (
+    fetch_egauge_data,
+    parse_csv_data,
+    calculate_hourly_consumption,
+    analyze_all,
 )
-from solar_integration import HA_URL, HA_ENTITIES, get_ha_token
 from ev_integration import is_ev_enabled, fetch_ev_live, get_vehicles, get_ev_config
 
 # ==========================================
 # App Setup
 # ==========================================
 
-app = FastAPI(title="Energy Dashboard", version="1.0.0")
+app = FastAPI(
+    title="Energy Dashboard",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 STATIC_DIR = Path(__file__).parent / "static"
 if STATIC_DIR.exists():
     app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
+# The dashboard page is read once at startup and served from memory with an
+# ETag, so warm browsers revalidate with a 304 instead of a full download.
+_index_path = STATIC_DIR / "index.html"
+INDEX_BYTES = _index_path.read_bytes() if _index_path.exists() else None
+INDEX_ETAG = f'"{hashlib.sha1(INDEX_BYTES).hexdigest()}"' if INDEX_BYTES else None
+
 # ==========================================
 # Cache
 # ==========================================
 
 
 class DataCache:
-    """Simple in-memory cache with TTL."""
+    """Bounded in-memory LRU cache with per-lookup TTL.
 
-    def __init__(self):
-        self._data = {}
-        self._timestamps = {}
+    Entries are (value, stored_at) pairs in an OrderedDict so ad-hoc keys
+    like egauge_day_YYYY-MM-DD or history_N can't grow it without limit:
+    once maxsize is reached the least recently used entry is evicted.
+    stored_at is time.monotonic(), so TTLs are immune to wall-clock jumps.
+    """
+
+    def __init__(self, maxsize=256):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._inflight = {}
 
     def get(self, key, ttl_seconds=5):
-        if key in self._data and key in self._timestamps:
-            if time.time() - self._timestamps[key] < ttl_seconds:
-                return self._data[key]
-        return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        if time.monotonic() - stored_at >= ttl_seconds:
+            return None
+        self._entries.move_to_end(key)
+        return value
 
     def set(self, key, value):
-        self._data[key] = value
-        self._timestamps[key] = time.time()
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    async def coalesce(self, key, factory):
+        """Single-flight: concurrent misses on key share one factory() call.
+
+        The first caller starts the fetch; anyone else arriving before it
+        finishes awaits the same task instead of hitting upstream again.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
 
 
 cache = DataCache()
 
+# ==========================================
+# Shared HTTP client
+# ==========================================
+
+# Built once and passed per eGauge request; the client itself is shared with
+# Home Assistant calls, so it must not carry eGauge credentials by default.
+EGAUGE_AUTH = httpx.BasicAuth(EGAUGE_USER, EGAUGE_PASSWORD)
+
+
+def get_http_client():
+    """Return the process-wide httpx.AsyncClient, creating it on first use.
+
+    One pooled client keeps TCP/TLS connections to eGauge and HA alive across
+    the 5s WebSocket ticks and the 60s background refresh instead of paying a
+    fresh handshake on every fetch.
+    """
+    client = getattr(app.state, "http", None)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+        )
+        app.state.http = client
+    return client
+
+
+@app.on_event("startup")
+async def startup_http_client():
+    get_http_client()
+
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    client = getattr(app.state, "http", None)
+    if client is not None:
+        await client.aclose()
+
+
+# ==========================================
+# Process pool for history/solar rebuilds
+# ==========================================
+
+_history_pool = None
+# HISTORY_WORKERS=0 runs rebuilds in the default thread pool instead, for
+# small hosts where spawning worker processes costs more than it saves.
+HISTORY_WORKERS = int(os.environ.get("HISTORY_WORKERS", "2"))
+
+
+def get_history_pool():
+    """Return the process pool used for _build_history / _build_solar.
+
+    Those rebuilds are CPU-bound Python (CSV parse + per-register stats over
+    N×24 hours); in a separate process they don't hold the GIL against the
+    event loop. Workers are spawned, not forked, because the server process
+    already has threads running.
+    """
+    global _history_pool
+    if _history_pool is None:
+        _history_pool = ProcessPoolExecutor(
+            max_workers=HISTORY_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _history_pool
+
+
+async def run_rebuild(fn, *args):
+    """Run a history/solar builder off the event loop.
+
+    Uses the process pool when enabled. If a worker died (OOM-killed under
+    the container memory limit, say) the broken pool is discarded so the next
+    call starts a fresh one, and this call falls back to a thread.
+    """
+    global _history_pool
+    loop = asyncio.get_event_loop()
+    if HISTORY_WORKERS > 0:
+        try:
+            return await loop.run_in_executor(get_history_pool(), fn, *args)
+        except BrokenProcessPool:
+            print(f"History worker pool broke during {fn.__name__}; restarting")
+            _history_pool = None
+    return await loop.run_in_executor(None, fn, *args)
+
+
+@app.on_event("shutdown")
+async def shutdown_history_pool():
+    if _history_pool is not None:
+        _history_pool.shutdown(wait=False, cancel_futures=True)
+
 # ==========================================
 # eGauge Data Fetching (async)
 # ==========================================
@@ -85,37 +232,43 @@ async def fetch_egauge_instant():
     cached = cache.get("egauge_instant", ttl_seconds=4)
     if cached:
         return cached
+    return await cache.coalesce("egauge_instant", _fetch_egauge_instant)
+
 
+async def _fetch_egauge_instant():
     url = f"{EGAUGE_URL}/cgi-bin/egauge?notemp&tot&inst"
-    async with httpx.AsyncClient() as client:
-        for attempt in range(3):
-            try:
-                resp = await client.get(
-                    url,
-                    auth=(EGAUGE_USER, EGAUGE_PASSWORD),
-                    timeout=10,
-                )
-                resp.raise_for_status()
-                break
-            except httpx.HTTPError as e:
-                if attempt < 2:
-                    await asyncio.sleep(1 * (attempt + 1))
-                    continue
-                print(f"eGauge fetch failed after 3 attempts: {e}")
-                return None
+    client = get_http_client()
+    for attempt in range(3):
+        try:
+            resp = await client.get(
+                url,
+                auth=EGAUGE_AUTH,
+                timeout=10,
+            )
+            resp.raise_for_status()
+            break
+        except httpx.HTTPError as e:
+            if attempt < 2:
+                await asyncio.sleep(1 * (attempt + 1))
+                continue
+            print(f"eGauge fetch failed after 3 attempts: {e}")
+            return None
 
-    # Parse XML
-    root = ET.fromstring(resp.text)
     circuits = []
     total_usage_w = 0
 
-    for reg in root.findall("r"):
-        name = reg.get("n", "")
-        rt = reg.get("rt", "")
-        inst_el = reg.find("i")
-        if inst_el is None:
+    # Stream the XML straight from the response bytes: each <r> is handled
+    # as soon as it closes and then cleared, so no full tree is kept.
+    for _, elem in ET.iterparse(BytesIO(resp.content), events=("end",)):
+        if elem.tag != "r":
+            continue
+        name = elem.get("n", "")
+        inst = elem.findtext("i")
+        rt = elem.get("rt", "")
+        elem.clear()
+        if inst is None:
             continue
-        watts = float(inst_el.text)
+        watts = float(inst)
 
         if rt == "total":
             if "Usage" in name:
@@ -128,7 +281,7 @@ async def fetch_egauge_instant():
         # Watts are negative for consumption in eGauge
         circuits.append({"name": name, "watts": abs(watts)})
 
-    circuits.sort(key=lambda c: c["watts"], reverse=True)
+    circuits.sort(key=itemgetter("watts"), reverse=True)
 
     result = {
         "circuits": circuits,
@@ -140,63 +293,148 @@ async def fetch_egauge_instant():
 
 async def fetch_ha_live():
     """Fetch live Powerwall state from Home Assistant."""
-    if not is_solar_enabled():
+    if not SOLAR_ENABLED:
         return None
 
     cached = cache.get("ha_live", ttl_seconds=4)
     if cached:
         return cached
+    return await cache.coalesce("ha_live", _fetch_ha_live)
+
 
+async def _fetch_ha_live():
     token = get_ha_token()
     if not token:
         return None
 
-    entity_ids = ",".join(HA_ENTITIES.values())
-    url = f"{HA_URL}/api/states"
+    # One small /api/states/<entity_id> GET per configured entity, in
+    # parallel over the pooled connections, instead of downloading every
+    # state HA knows about and filtering out the handful we use.
+    client = get_http_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    entity_ids = list(HA_ENTITY_TO_KEY)
+    responses = await asyncio.gather(
+        *(
+            client.get(f"{HA_URL}/api/states/{entity_id}", headers=headers, timeout=10)
+            for entity_id in entity_ids
+        ),
+        return_exceptions=True,
+    )
 
-    async with httpx.AsyncClient() as client:
+    current = {}
+    for entity_id, resp in zip(entity_ids, responses):
+        if isinstance(resp, Exception):
+            return None
+        if resp.status_code == 404:
+            continue  # entity not (or no longer) present in HA
         try:
-            resp = await client.get(
-                url,
-                headers={"Authorization": f"Bearer {token}"},
-                timeout=10,
-            )
             resp.raise_for_status()
         except httpx.HTTPError:
             return None
-
-    states = resp.json()
-    current = {}
-    for state in states:
-        for key, entity_id in HA_ENTITIES.items():
-            if state["entity_id"] == entity_id:
-                try:
-                    current[key] = float(state["state"])
-                except (ValueError, TypeError):
-                    current[key] = 0.0
+        state = orjson.loads(resp.content)
+        key = HA_ENTITY_TO_KEY[entity_id]
+        try:
+            current[key] = float(state["state"])
+        except (ValueError, TypeError):
+            current[key] = 0.0
 
     cache.set("ha_live", current)
     return current
 
 
-async def fetch_egauge_today(target_date=None):
+_EXCLUDED_REGISTERS = frozenset(EXCLUDE_REGISTERS)
+
+
+@lru_cache(maxsize=4096)
+def _local_time_fields(ts):
+    """(datetime, hour, 'YYYY-MM-DD', tou_period) for a UNIX timestamp.
+
+    eGauge rows are hour-aligned and the same timestamps come back on every
+    refresh and per-day request, so each one is converted only once. A fixed
+    UTC offset would be cheaper but goes wrong across DST changes.
+    """
+    dt = datetime.fromtimestamp(ts)
+    return dt, dt.hour, str(dt.date()), HOUR_TO_TOU[dt.hour]
+
+
+def _float_column(rows, idx):
+    """Parse column idx of CSV rows as floats; unparseable/missing cells -> 0.0."""
+    try:
+        return list(map(float, map(itemgetter(idx), rows)))
+    except (ValueError, IndexError):
+        pass
+    column = []
+    for values in rows:
+        try:
+            column.append(float(values[idx]))
+        except (ValueError, IndexError):
+            column.append(0.0)
+    return column
+
+
+def _diff_hourly_rows(rows):
+    """Diff consecutive cumulative rows into per-hour, per-circuit kWh + cost.
+
+    Consumption between two readings belongs to the earlier (start) hour.
+    """
+    hourly = []
+    if len(rows) < 2:
+        return hourly
+    # Every row shares the same CSV header: resolve the circuit columns and
+    # display names once instead of re-checking each key on every row.
+    kwh_cols = tuple(
+        (k, k.replace(" [kWh]", ""))
+        for k in rows[-1]
+        if k.endswith("[kWh]") and k not in _EXCLUDED_REGISTERS
+    )
+    names = [name for _, name in kwh_cols]
+    # Diff column-wise (one map() over each register's readings), then
+    # transpose back to one tuple of circuit kWh per hour.
+    diffs = []
+    for key, _ in kwh_cols:
+        column = [r[key] for r in rows]
+        diffs.append(list(map(abs, map(sub, column[1:], column[:-1]))))
+    hour_kwhs = zip(*diffs) if diffs else [()] * (len(rows) - 1)
+    for prev, kwhs in zip(rows, hour_kwhs):
+        # One rate per hour (it only depends on season + TOU period)
+        tou_period, rate = tou_table_for(prev["datetime"])[prev["hour"]]
+        circuits = {}
+        total_kwh = 0
+        total_cost = 0
+        for name, kwh in zip(names, kwhs):
+            cost = kwh * rate
+            circuits[name] = {"kwh": kwh, "cost": cost}
+            total_kwh += kwh
+            total_cost += cost
+        hourly.append(
+            {
+                "hour": prev["hour"],
+                "date": prev["date"],
+                "tou_period": tou_period,
+                "circuits": circuits,
+                "total_kwh": total_kwh,
+                "total_cost": total_cost,
+            }
+        )
+    return hourly
+
+
+async def fetch_egauge_today(target_date=None, refresh=False):
     """Fetch hourly data for today or a specific date from eGauge.
 
     Args:
         target_date: Optional date string 'YYYY-MM-DD'. None = today (with live partial hour).
+        refresh: Skip the cached result (completed hours are still reused).
     """
     now = datetime.now()
     is_today = target_date is None or target_date == str(now.date())
 
     cache_key = "egauge_today" if is_today else f"egauge_day_{target_date}"
     ttl = 60 if is_today else 3600  # Cache historical days longer
-    cached = cache.get(cache_key, ttl_seconds=ttl)
+    cached = None if refresh else cache.get(cache_key, ttl_seconds=ttl)
     if cached:
         return cached
 
-    import csv
-    from io import StringIO
-
     if is_today:
         target_date_str = str(now.date())
         hours_today = now.hour + 1
@@ -219,23 +457,64 @@ async def fetch_egauge_today(target_date=None):
         hourly_url = f"{EGAUGE_URL}/cgi-bin/egauge-show?c&h&n={n_rows}"
         current_url = None  # No partial hour for historical dates
 
-    async with httpx.AsyncClient() as client:
+    def parse_egauge_rows(content):
+        # Plain csv.reader + a header index map: no per-row dict from
+        # DictReader, and each value is looked up by position. The raw
+        # body is decoded incrementally rather than copied into one str.
+        reader = csv.reader(
+            TextIOWrapper(BytesIO(content), encoding="utf-8", newline="")
+        )
+        header = next(reader, None)
+        if not header:
+            return []
+        ts_idx = header.index("Date & Time")
+        # Only the circuit kWh registers are diffed downstream; skip the
+        # float() parse for every other column.
+        value_cols = [
+            (i, key)
+            for i, key in enumerate(header)
+            if key.endswith("[kWh]") and key not in _EXCLUDED_REGISTERS
+        ]
+        body = [values for values in reader if values]
+        if not body:
+            return []
+        # Column-at-a-time: one map() per column instead of a float() call
+        # and dict store per cell.
+        keys = [key for _, key in value_cols]
+        columns = [_float_column(body, i) for i, _ in value_cols]
+        result = []
+        row_values = zip(*columns) if columns else [()] * len(body)
+        for values, row_vals in zip(body, row_values):
+            dt, hour, date_str, tou_period = _local_time_fields(int(values[ts_idx]))
+            parsed = {
+                "datetime": dt,
+                "hour": hour,
+                "date": date_str,
+                "tou_period": tou_period,
+            }
+            parsed.update(zip(keys, row_vals))
+            result.append(parsed)
+        return result
+
+    # Completed hours don't change until the hour rolls over, so within an
+    # hour only the partial-hour reading needs to be fetched again.
+    rows = None
+    if is_today:
+        completed = cache.get("egauge_today_completed", ttl_seconds=3600)
+        if (
+            completed
+            and completed["date"] == target_date_str
+            and completed["hour"] == now.hour
+        ):
+            rows = list(completed["rows"])
+
+    client = get_http_client()
+    if rows is None:
         for attempt in range(3):
             try:
-                if current_url:
-                    hourly_resp, current_resp = await asyncio.gather(
-                        client.get(
-                            hourly_url, auth=(EGAUGE_USER, EGAUGE_PASSWORD), timeout=15
-                        ),
-                        client.get(
-                            current_url, auth=(EGAUGE_USER, EGAUGE_PASSWORD), timeout=15
-                        ),
-                    )
-                else:
-                    hourly_resp = await client.get(
-                        hourly_url, auth=(EGAUGE_USER, EGAUGE_PASSWORD), timeout=15
-                    )
-                    current_resp = None
+                hourly_resp = await client.get(
+                    hourly_url, auth=EGAUGE_AUTH, timeout=15
+                )
                 hourly_resp.raise_for_status()
                 break
             except httpx.HTTPError as e:
@@ -245,63 +524,36 @@ async def fetch_egauge_today(target_date=None):
                 print(f"eGauge hourly fetch failed after 3 attempts: {e}")
                 return None
 
-    def parse_egauge_rows(text):
-        reader = csv.DictReader(StringIO(text))
-        result = []
-        for row in reader:
-            ts = int(row["Date & Time"])
-            dt = datetime.fromtimestamp(ts)
-            parsed = {
-                "datetime": dt,
-                "hour": dt.hour,
-                "date": str(dt.date()),
-                "tou_period": get_tou_period(dt.hour),
-            }
-            for key, val in row.items():
-                if key != "Date & Time":
-                    try:
-                        parsed[key] = float(val)
-                    except ValueError:
-                        parsed[key] = 0.0
-            result.append(parsed)
-        return result
-
-    rows = parse_egauge_rows(hourly_resp.text)
-    rows.sort(key=lambda x: x["datetime"])
+        rows = parse_egauge_rows(hourly_resp.content)
+        rows.sort(key=itemgetter("datetime"))
+        # Only reuse once eGauge has logged this hour's boundary row;
+        # otherwise the next partial diff would span more than an hour.
+        if (
+            is_today
+            and rows
+            and rows[-1]["date"] == target_date_str
+            and rows[-1]["hour"] == now.hour
+        ):
+            cache.set(
+                "egauge_today_completed",
+                {"date": target_date_str, "hour": now.hour, "rows": list(rows)},
+            )
 
-    # Append current reading for partial hour (today only)
-    if is_today and current_resp:
+    # Append current reading for partial hour (today only). Right after the
+    # hour rolls over the newest hourly row already is "now"; nothing to add.
+    if is_today and rows and (now - rows[-1]["datetime"]).total_seconds() >= 60:
         try:
-            current_rows = parse_egauge_rows(current_resp.text)
-            if current_rows and rows:
-                latest = current_rows[-1]
-                if latest["datetime"] > rows[-1]["datetime"]:
-                    rows.append(latest)
+            current_resp = await client.get(current_url, auth=EGAUGE_AUTH, timeout=15)
+            current_resp.raise_for_status()
+            current_rows = parse_egauge_rows(current_resp.content)
+            latest = current_rows[-1] if current_rows else None
+            if latest and latest["datetime"] > rows[-1]["datetime"]:
+                rows.append(latest)
         except Exception as e:
             print(f"Failed to append current reading for partial hour: {e}")
 
     # Diff consecutive rows for hourly consumption
-    hourly = []
-    for i in range(1, len(rows)):
-        prev, curr = rows[i - 1], rows[i]
-        tou_period = get_tou_period(prev["hour"])
-        entry = {
-            "hour": prev["hour"],
-            "date": prev["date"],
-            "tou_period": tou_period,
-            "circuits": {},
-        }
-        total_kwh = 0
-        for key in curr:
-            if key.endswith("[kWh]") and key not in EXCLUDE_REGISTERS:
-                kwh = abs(curr[key] - prev[key])
-                name = key.replace(" [kWh]", "")
-                rate = get_rate(prev["datetime"], tou_period)
-                entry["circuits"][name] = {"kwh": kwh, "cost": kwh * rate}
-                total_kwh += kwh
-        entry["total_kwh"] = total_kwh
-        entry["total_cost"] = sum(c["cost"] for c in entry["circuits"].values())
-        hourly.append(entry)
+    hourly = _diff_hourly_rows(rows)
 
     # Filter to target date only
     day_hours = [h for h in hourly if h.get("date") == target_date_str]
@@ -312,8 +564,6 @@ async def fetch_egauge_today(target_date=None):
     grid_share_by_hour = {}  # {hour_int: 0.0..1.0 (grid fraction of consumption)}
     battery_kwh_by_hour = {}  # {hour_int: kWh discharged from battery}
     try:
-        from solar_integration import is_solar_enabled, build_hourly_solar_data
-
         if is_solar_enabled():
             from datetime import date as _date_cls, datetime as _dt
 
@@ -339,39 +589,61 @@ async def fetch_egauge_today(target_date=None):
     # Apply discount + emit battery contribution per hour:
     # cost = circuit_kwh × rate × grid_share_for_this_hour (grid-only)
     # battery_avoided_cost = battery_kwh × tou_rate (what would have been paid at retail)
-    # get_rate already imported at module level
+    # Rates come from the season's per-hour table (config.tou_table_for)
     from datetime import datetime as _dt2
 
     try:
         target_d_obj = _dt2.strptime(target_date_str, "%Y-%m-%d").date()
     except Exception:
         target_d_obj = datetime.now().date()
+    day_tou_table = tou_table_for(target_d_obj)
     for h in day_hours:
         gs = grid_share_by_hour.get(h.get("hour"), 1.0)
         if gs < 1.0:
+            total = 0
             for circ in h["circuits"].values():
-                circ["cost"] = circ["cost"] * gs
-            h["total_cost"] = sum(c["cost"] for c in h["circuits"].values())
+                circ["cost"] = cost = circ["cost"] * gs
+                total += cost
+            h["total_cost"] = total
         bkwh = battery_kwh_by_hour.get(h.get("hour"), 0)
         h["battery_kwh"] = round(bkwh, 3)
         try:
-            rate = get_rate(target_d_obj, h.get("tou_period", "off_peak"))
+            rate = day_tou_table[h["hour"]][1]
             h["battery_avoided_cost"] = round(bkwh * rate, 3)
         except Exception:
             h["battery_avoided_cost"] = 0
 
-    circuit_totals = defaultdict(lambda: {"kwh": 0, "cost": 0, "watts": 0})
+    # Day totals per circuit as parallel lists (struct-of-arrays) indexed by
+    # circuit_idx[name], instead of one dict per circuit
+    circuit_idx = {}
+    circuit_names = []
+    circuit_kwh = []
+    circuit_cost = []
     total_cost = 0
     total_kwh = 0
     hourly_costs = []
 
     for h in day_hours:
+        # One pass over the hour's circuits: accumulate day totals and collect
+        # the visible ones, then a single sort by cost.
+        visible = []
+        for name, data in h["circuits"].items():
+            kwh = data["kwh"]
+            cost = data["cost"]
+            idx = circuit_idx.get(name)
+            if idx is None:
+                idx = circuit_idx[name] = len(circuit_names)
+                circuit_names.append(name)
+                circuit_kwh.append(0)
+                circuit_cost.append(0)
+            circuit_kwh[idx] += kwh
+            circuit_cost[idx] += cost
+            if kwh > 0.001:
+                visible.append((cost, name, kwh))
+        visible.sort(key=itemgetter(0), reverse=True)
         hour_circuits = [
-            {"name": name, "kwh": round(data["kwh"], 3), "cost": round(data["cost"], 3)}
-            for name, data in sorted(
-                h["circuits"].items(), key=lambda x: x[1]["cost"], reverse=True
-            )
-            if data["kwh"] > 0.001
+            {"name": name, "kwh": round(kwh, 3), "cost": round(cost, 3)}
+            for cost, name, kwh in visible
         ]
         entry = {
             "hour": h["hour"],
@@ -388,9 +660,10 @@ async def fetch_egauge_today(target_date=None):
         hourly_costs.append(entry)
         total_cost += h["total_cost"]
         total_kwh += h["total_kwh"]
-        for name, data in h["circuits"].items():
-            circuit_totals[name]["kwh"] += data["kwh"]
-            circuit_totals[name]["cost"] += data["cost"]
+
+    by_cost = sorted(
+        range(len(circuit_names)), key=circuit_cost.__getitem__, reverse=True
+    )
 
     result = {
         "date": target_date_str,
@@ -398,10 +671,12 @@ async def fetch_egauge_today(target_date=None):
         "total_kwh": round(total_kwh, 2),
         "hourly": hourly_costs,
         "circuits": [
-            {"name": name, "kwh": round(d["kwh"], 2), "cost": round(d["cost"], 2)}
-            for name, d in sorted(
-                circuit_totals.items(), key=lambda x: x[1]["cost"], reverse=True
-            )
+            {
+                "name": circuit_names[i],
+                "kwh": round(circuit_kwh[i], 2),
+                "cost": round(circuit_cost[i], 2),
+            }
+            for i in by_cost
         ],
     }
     cache.set(cache_key, result)
@@ -415,30 +690,50 @@ async def fetch_history(days=7):
     if cached:
         return cached
 
-    # Run the heavy lifting in a thread to avoid blocking
-    loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(None, _build_history, days)
-    if result:
-        cache.set(cache_key, result)
-    return result
+    async def _rebuild():
+        # Run the heavy lifting in a worker process to avoid blocking
+        result = await run_rebuild(_build_history, days)
+        if result:
+            cache.set(cache_key, result)
+        return result
+
+    return await cache.coalesce(cache_key, _rebuild)
+
+
+# Field layouts for the history/solar responses; rounded in one pass each.
+_HISTORY_CIRCUIT_FIELDS = ("total_kwh", "total_cost", "avg_daily_kwh", "avg_daily_cost")
+_HISTORY_DAILY_FIELDS = (
+    "total_kwh",
+    "total_cost",
+    "peak_cost",
+    "off_peak_cost",
+    "part_peak_cost",
+)
+_SOLAR_CIRCUIT_FIELDS = (
+    "total_kwh",
+    "grid_kwh",
+    "solar_kwh",
+    "battery_kwh",
+    "grid_cost",
+    "battery_cost",
+    "actual_cost",
+    "full_rate_cost",
+    "solar_savings",
+)
+
+
+def _round_fields(src, fields, ndigits=2):
+    """Return {field: round(src[field], ndigits)} for each field, in order."""
+    return {f: round(src[f], ndigits) for f in fields}
 
 
 def _build_history(days):
     """Synchronous history builder using existing toolkit."""
-    from egauge_weekly_analysis import (
-        fetch_egauge_data,
-        parse_csv_data,
-        calculate_hourly_consumption,
-        analyze_data,
-        calculate_daily_totals,
-    )
-
     try:
         csv_data = fetch_egauge_data(days)
         parsed = parse_csv_data(csv_data)
         hourly_data = calculate_hourly_consumption(parsed)
-        register_stats = analyze_data(hourly_data, days)
-        daily_totals = calculate_daily_totals(hourly_data)
+        register_stats, daily_totals = analyze_all(hourly_data, days)
     except Exception as e:
         print(f"Error building history: {e}")
         return None
@@ -474,10 +769,7 @@ def _build_history(days):
         circuits.append(
             {
                 "name": name,
-                "total_kwh": round(stats["total_kwh"], 2),
-                "total_cost": round(stats["total_cost"], 2),
-                "avg_daily_kwh": round(stats["avg_daily_kwh"], 2),
-                "avg_daily_cost": round(stats["avg_daily_cost"], 2),
+                **_round_fields(stats, _HISTORY_CIRCUIT_FIELDS),
                 "daily_kwh": daily_kwh,
                 "anomaly": anomaly,
                 "by_tou": {
@@ -491,28 +783,21 @@ def _build_history(days):
             }
         )
 
-    daily = []
-    for d in daily_totals:
-        daily.append(
-            {
-                "date": d["date"],
-                "total_kwh": round(d["total_kwh"], 2),
-                "total_cost": round(d["total_cost"], 2),
-                "peak_cost": round(d["peak_cost"], 2),
-                "off_peak_cost": round(d["off_peak_cost"], 2),
-                "part_peak_cost": round(d["part_peak_cost"], 2),
-            }
-        )
+    daily = [
+        {"date": d["date"], **_round_fields(d, _HISTORY_DAILY_FIELDS)}
+        for d in daily_totals
+    ]
 
     # Generate optimization opportunities
     opportunities = []
+    # Estimate savings if shifted to off-peak using actual config rates
+    now = datetime.now()
+    peak_rate = get_rate(now, "peak")
+    off_peak_rate = get_rate(now, "off_peak")
     for c in circuits:
         peak_pct = c["by_tou"].get("peak", {}).get("percent", 0)
         peak_cost = c["by_tou"].get("peak", {}).get("cost", 0)
         if peak_pct > 20 and peak_cost > 1.0:
-            # Estimate savings if shifted to off-peak using actual config rates
-            peak_rate = get_rate(datetime.now(), "peak")
-            off_peak_rate = get_rate(datetime.now(), "off_peak")
             if peak_rate <= 0:
                 continue
             potential_savings = peak_cost * (1 - off_peak_rate / peak_rate)
@@ -526,27 +811,28 @@ def _build_history(days):
                     "avg_daily_cost": c["avg_daily_cost"],
                 }
             )
-    opportunities.sort(key=lambda x: x["potential_savings"], reverse=True)
+    opportunities.sort(key=itemgetter("potential_savings"), reverse=True)
 
     # Per-hour consumption totals for source chart battery inference
-    hourly_detail = []
-    for h in hourly_data:
-        total_h = sum(
-            v for k, v in h.items() if isinstance(k, str) and k.endswith("[kWh]")
-        )
-        hourly_detail.append(
-            {
-                "date": str(h["date"]),
-                "hour": h["hour"],
-                "kwh": round(total_h, 3),
-            }
-        )
+    # Every hour comes from the same CSV header, so the kWh columns are
+    # resolved once rather than suffix-tested on every key of every hour.
+    kwh_keys = (
+        [k for k in hourly_data[0] if isinstance(k, str) and k.endswith("[kWh]")]
+        if hourly_data
+        else []
+    )
+    hourly_detail = [
+        {
+            "date": str(h["date"]),
+            "hour": h["hour"],
+            "kwh": round(sum([h[k] for k in kwh_keys]), 3),
+        }
+        for h in hourly_data
+    ]
 
     # Per-day grid_share discount: cost should reflect that battery+solar
     # covered part of consumption (already paid for or free), not full retail.
     try:
-        from solar_integration import is_solar_enabled, build_hourly_solar_data
-
         if is_solar_enabled():
             solar_hourly = build_hourly_solar_data(days=days)
             if solar_hourly:
@@ -568,8 +854,6 @@ def _build_history(days):
                 # by_tou.<period>.grid_cost computes — the two endpoints
                 # finally reconcile. (User caught the 40% off-peak under-count
                 # 2026-05-11; this is the structural fix.)
-                from solar_integration import get_export_credit as _gec
-
                 day_period_grid_cost = {}  # {(date, period): $}
                 day_period_export_credit = {}  # {(date, period): $}
                 day_period_grid_kwh = {}  # {(date, period): kWh imported}
@@ -582,11 +866,11 @@ def _build_history(days):
                     export_kwh = h.get("grid_export_kwh", 0) or 0
                     batt = h.get("battery_discharge_kwh", 0) or 0
                     sol = h.get("solar_kwh", 0) or 0
-                    period = get_tou_period(int(hour_int))
+                    period = HOUR_TO_TOU[int(hour_int)]
                     try:
                         d_obj = _dt_h.strptime(date_str, "%Y-%m-%d").date()
-                        rate = get_rate(d_obj, period)
-                        credit = _gec(d_obj, period)
+                        rate = tou_table_for(d_obj)[int(hour_int)][1]
+                        credit = get_export_credit(d_obj, period)
                     except Exception:
                         rate = 0.0
                         credit = 0.0
@@ -687,9 +971,7 @@ def _build_history(days):
                 # already does that for per-circuit per-TOU; we just need to
                 # USE its output instead of re-deriving via approximation.
                 try:
-                    from solar_integration import blend_egauge_with_solar as _blend
-
-                    blended, _sys = _blend(hourly_data, solar_hourly)
+                    blended, _sys = blend_egauge_with_solar(hourly_data, solar_hourly)
                     by_name = {
                         reg.replace(" [kWh]", ""): st for reg, st in blended.items()
                     }
@@ -740,13 +1022,19 @@ def _build_history(days):
         # Solar unconfigured or fetch failed — leave costs at gross retail
         pass
 
+    total_kwh = 0
+    total_cost = 0
+    for c in circuits:
+        total_kwh += c["total_kwh"]
+        total_cost += c["total_cost"]
+
     return {
         "days": days,
         "circuits": circuits,
         "daily": daily,
         "opportunities": opportunities,
-        "total_kwh": round(sum(c["total_kwh"] for c in circuits), 2),
-        "total_cost": round(sum(c["total_cost"] for c in circuits), 2),
+        "total_kwh": round(total_kwh, 2),
+        "total_cost": round(total_cost, 2),
         "_hourly_detail": hourly_detail,
     }
 
@@ -763,11 +1051,13 @@ async def fetch_solar(days=7, today_only=False):
     if cached:
         return cached
 
-    loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(None, _build_solar, days, today_only)
-    if result:
-        cache.set(cache_key, result)
-    return result
+    async def _rebuild():
+        result = await run_rebuild(_build_solar, days, today_only)
+        if result:
+            cache.set(cache_key, result)
+        return result
+
+    return await cache.coalesce(cache_key, _rebuild)
 
 
 def _build_solar(days, today_only=False):
@@ -777,13 +1067,6 @@ def _build_solar(days, today_only=False):
     (midnight → now in local time). Used by the glance card so labels
     saying "today" actually reflect today's data, not a rolling 24h window.
     """
-    from egauge_weekly_analysis import (
-        fetch_egauge_data,
-        parse_csv_data,
-        calculate_hourly_consumption,
-    )
-    from solar_integration import build_hourly_solar_data, blend_egauge_with_solar
-
     # When restricting to today, still fetch ≥2 days so calculate_hourly_consumption
     # has the prior cumulative reading needed to diff today's first hour correctly.
     fetch_days = max(days, 2) if today_only else days
@@ -818,15 +1101,7 @@ def _build_solar(days, today_only=False):
         circuits.append(
             {
                 "name": name,
-                "total_kwh": round(stats["total_kwh"], 2),
-                "grid_kwh": round(stats["grid_kwh"], 2),
-                "solar_kwh": round(stats["solar_kwh"], 2),
-                "battery_kwh": round(stats["battery_kwh"], 2),
-                "grid_cost": round(stats["grid_cost"], 2),
-                "battery_cost": round(stats["battery_cost"], 2),
-                "actual_cost": round(stats["actual_cost"], 2),
-                "full_rate_cost": round(stats["full_rate_cost"], 2),
-                "solar_savings": round(stats["solar_savings"], 2),
+                **_round_fields(stats, _SOLAR_CIRCUIT_FIELDS),
                 "by_tou": {
                     period: {
                         "kwh": round(tou_data["kwh"], 2),
@@ -840,16 +1115,13 @@ def _build_solar(days, today_only=False):
     # Hourly source breakdown for charts.
     # Include per-hour cost/credit so the UI can drill into "where today's net
     # cost came from" without having to know the TOU rate table.
-    from solar_integration import get_export_credit
-
     hourly_source = []
     for key in sorted(solar_data.keys()):
         date_str, hour = key
         h = solar_data[key]
         try:
             dt_for_rate = datetime.strptime(date_str, "%Y-%m-%d").replace(hour=hour)
-            tou_period = get_tou_period(hour)
-            rate = get_rate(dt_for_rate, tou_period)
+            tou_period, rate = tou_table_for(dt_for_rate)[hour]
             credit = get_export_credit(dt_for_rate, tou_period)
         except Exception:
             tou_period = "off_peak"
@@ -972,8 +1244,8 @@ def _build_solar(days, today_only=False):
                 continue
             try:
                 d_obj = datetime.strptime(h["date"], "%Y-%m-%d").date()
-                period = h.get("tou_period") or get_tou_period(int(h["hour"]))
-                battery_value_displaced += disch * get_rate(d_obj, period)
+                rate = tou_table_for(d_obj)[int(h["hour"])][1]
+                battery_value_displaced += disch * rate
             except Exception:
                 pass
 
@@ -1000,23 +1272,42 @@ def _build_solar(days, today_only=False):
 
 
 @app.get("/", response_class=HTMLResponse)
-async def dashboard():
+async def dashboard(request: Request):
     """Serve the dashboard page."""
-    index = STATIC_DIR / "index.html"
-    if index.exists():
-        return FileResponse(str(index))
-    return HTMLResponse("<h1>Energy Dashboard</h1><p>static/index.html not found</p>")
+    if INDEX_BYTES is None:
+        return HTMLResponse(
+            "<h1>Energy Dashboard</h1><p>static/index.html not found</p>"
+        )
+    headers = {"ETag": INDEX_ETAG, "Cache-Control": "public, max-age=60"}
+    if request.headers.get("if-none-match") == INDEX_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(content=INDEX_BYTES, media_type="text/html", headers=headers)
 
 
-@app.get("/api/config")
-async def api_config():
-    """Return dashboard configuration for the frontend."""
-    cfg = get_config()
-    return {
+# config.yml is loaded once per process, so the frontend config payload is
+# serialized once instead of on every request.
+CONFIG_BYTES = orjson.dumps(
+    {
         "solar_enabled": is_solar_enabled(),
         "ev_enabled": is_ev_enabled(),
-        "plan_name": cfg.get("rates", {}).get("plan_name", "Custom"),
+        "plan_name": PLAN_NAME,
     }
+)
+
+
+@app.get("/api/config")
+async def api_config():
+    """Return dashboard configuration for the frontend."""
+    return Response(
+        content=CONFIG_BYTES,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=30"},
+    )
+
+
+# The analysis endpoints below return their (large) payloads as
+# ORJSONResponse directly: returning a plain dict would first walk the whole
+# structure through FastAPI's jsonable_encoder before orjson ever sees it.
 
 
 @app.get("/api/today")
@@ -1029,7 +1320,7 @@ async def api_today(date: str = None):
     data = await fetch_egauge_today(target_date=date)
     if not data:
         return {"error": "Could not fetch data"}
-    return data
+    return ORJSONResponse(data)
 
 
 @app.get("/api/history")
@@ -1039,7 +1330,7 @@ async def api_history(days: int = 7):
     data = await fetch_history(days)
     if not data:
         return {"error": "Could not fetch data"}
-    return data
+    return ORJSONResponse(data)
 
 
 @app.get("/api/solar")
@@ -1055,7 +1346,7 @@ async def api_solar(days: int = 7, today: bool = False):
     data = await fetch_solar(days, today_only=today)
     if not data:
         return {"error": "Could not fetch solar data"}
-    return data
+    return ORJSONResponse(data)
 
 
 @app.get("/api/energy-flows")
@@ -1682,7 +1973,7 @@ connected_clients: set[WebSocket] = set()
 
 async def build_live_payload():
     """Build the live data payload from eGauge + HA."""
-    if is_solar_enabled():
+    if SOLAR_ENABLED:
         egauge, ha = await asyncio.gather(
             fetch_egauge_instant(),
             fetch_ha_live(),
@@ -1692,11 +1983,12 @@ async def build_live_payload():
         ha = None
 
     now = datetime.now()
-    tou_period = get_tou_period(now.hour)
-    rate = get_rate(now, tou_period)
+    tou_period, rate = tou_table_for(now)[now.hour]
 
     payload = {
-        "timestamp": now.isoformat(),
+        # UNIX ms: cheaper than isoformat() and `new Date(d.timestamp)` in the
+        # frontend accepts it unchanged (and it is unambiguous about timezone)
+        "timestamp": int(time.time() * 1000),
         "tou_period": tou_period,
         "tou_rate": rate,
         "circuits": [],
@@ -1727,10 +2019,11 @@ async def build_live_payload():
     grid_supply = max(0, payload["grid_w"])  # positive = importing from grid
     total_supply = solar_supply + battery_supply + grid_supply
     if total_supply > 0:
+        pct = 100 / total_supply
         payload["source_mix"] = {
-            "solar": round(solar_supply / total_supply * 100, 1),
-            "battery": round(battery_supply / total_supply * 100, 1),
-            "grid": round(grid_supply / total_supply * 100, 1),
+            "solar": round(solar_supply * pct, 1),
+            "battery": round(battery_supply * pct, 1),
+            "grid": round(grid_supply * pct, 1),
         }
     else:
         payload["source_mix"] = {"solar": 0, "battery": 0, "grid": 0}
@@ -1762,41 +2055,111 @@ async def build_live_payload():
     return payload
 
 
+# Most recent broadcast frame as (text, time.monotonic()); new clients get this
+# instead of building a payload of their own.
+_last_live_frame = None
+
+
+def _encode_live_frame(payload):
+    # Text frame (the frontend JSON.parses e.data), encoded by orjson
+    return orjson.dumps(payload).decode()
+
+
+async def _current_live_frame():
+    """Return the last broadcast frame if it is still fresh, else build one."""
+    if _last_live_frame is not None and time.monotonic() - _last_live_frame[1] < 5:
+        return _last_live_frame[0]
+    return _encode_live_frame(await build_live_payload())
+
+
 @app.websocket("/api/live")
 async def websocket_live(ws: WebSocket):
-    """WebSocket endpoint pushing live data every 5 seconds."""
+    """WebSocket endpoint; live data is pushed every 5s by broadcast_live()."""
     await ws.accept()
-    connected_clients.add(ws)
     try:
+        # Send a frame right away so new clients don't wait for the next tick
+        await ws.send_text(await _current_live_frame())
+        connected_clients.add(ws)
+        # Nothing to read from clients — just park until they disconnect
         while True:
-            payload = await build_live_payload()
-            await ws.send_json(payload)
-            await asyncio.sleep(5)
+            message = await ws.receive()
+            if message["type"] == "websocket.disconnect":
+                break
     except WebSocketDisconnect:
         pass
     finally:
         connected_clients.discard(ws)
 
 
+async def _drop_live_client(ws):
+    """Forget a client and close its socket so websocket_live() returns.
+
+    Without the close, a stalled peer stays parked in ws.receive() and its
+    dashboard silently stops updating instead of reconnecting.
+    """
+    connected_clients.discard(ws)
+    try:
+        await asyncio.wait_for(ws.close(code=1011), 1)
+    except Exception:
+        pass
+
+
+async def _send_live_frame(frame, timeout=5):
+    """Send one encoded frame to every connected client concurrently."""
+    clients = list(connected_clients)
+    # A stalled client is dropped instead of holding up the tick
+    results = await asyncio.gather(
+        *(asyncio.wait_for(ws.send_text(frame), timeout) for ws in clients),
+        return_exceptions=True,
+    )
+    for ws, res in zip(clients, results):
+        if isinstance(res, Exception):
+            await _drop_live_client(ws)
+
+
+async def broadcast_live():
+    """Build the live payload once per tick and fan it out to every client.
+
+    Upstream fetches and JSON encoding happen once per 5s regardless of how
+    many dashboards are open.
+    """
+    global _last_live_frame
+    while True:
+        if connected_clients:
+            try:
+                frame = _encode_live_frame(await build_live_payload())
+                _last_live_frame = (frame, time.monotonic())
+                await _send_live_frame(frame)
+            except Exception as e:
+                print(f"Live broadcast error: {e}")
+        await asyncio.sleep(5)
+
+
 # ==========================================
 # Background: refresh today cache periodically
 # ==========================================
 
 
 async def background_today_refresh():
-    """Refresh today's cost data every 60 seconds."""
+    """Refresh today's cost data once a minute, on the minute boundary.
+
+    Completed hours are only re-fetched when the hour rolls over; the other
+    ticks reuse them and just refresh the partial hour.
+    """
     while True:
         try:
-            await fetch_egauge_today()
+            await fetch_egauge_today(refresh=True)
         except Exception as e:
             print(f"Background today refresh error: {e}")
-        await asyncio.sleep(60)
+        now = datetime.now()
+        await asyncio.sleep(60 - now.second - now.microsecond / 1_000_000)
 
 
 @app.on_event("startup")
 async def startup():
     asyncio.create_task(background_today_refresh())
     asyncio.create_task(background_daily_backfill())
+    asyncio.create_task(broadcast_live())
 
 
 # ==========================================
@@ -1922,7 +2285,7 @@ def schedule_weekly_email():
         print("Email not enabled, skipping weekly scheduler.")
         return
 
-    def _email_loop():
+    async def _email_loop():
         while True:
             now = datetime.now()
             # Next Monday 6 AM
@@ -1936,23 +2299,30 @@ def schedule_weekly_email():
             print(
                 f"Weekly email scheduled for {next_monday} ({sleep_seconds/3600:.1f}h from now)"
             )
-            time.sleep(sleep_seconds)
+            await asyncio.sleep(sleep_seconds)
 
             # Run the report — only add --solar when enabled
             try:
-                import subprocess
-
                 script = str(Path(__file__).parent / "egauge_weekly_analysis.py")
                 cmd = ["python3", script, "--days", "7", "--email"]
-                if is_solar_enabled():
+                if SOLAR_ENABLED:
                     cmd.append("--solar")
-                subprocess.run(cmd, check=True, timeout=300)
+                proc = await asyncio.create_subprocess_exec(*cmd)
+                try:
+                    returncode = await asyncio.wait_for(proc.wait(), timeout=300)
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+                    raise RuntimeError("report timed out after 300s")
+                if returncode != 0:
+                    raise RuntimeError(f"report exited with status {returncode}")
                 print(f"Weekly email sent at {datetime.now()}")
             except Exception as e:
                 print(f"Weekly email error: {e}")
 
-    thread = threading.Thread(target=_email_loop, daemon=True)
-    thread.start()
+    # Keep a reference: the loop only holds weak refs to tasks, and this one
+    # spends nearly all its life suspended in asyncio.sleep().
+    app.state.email_task = asyncio.create_task(_email_loop())
 
 
 @app.on_event("startup")
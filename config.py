@@ -9,6 +9,7 @@ Credentials are loaded from environment variables or .env file.
 
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 import yaml
@@ -101,8 +102,7 @@ def get_cca_storage_credit():
 
 def is_solar_enabled():
     """Check if solar integration is enabled in config."""
-    cfg = _load_config()
-    return cfg.get('solar', {}).get('enabled', False)
+    return SOLAR_ENABLED
 
 
 # ==========================================
@@ -130,6 +130,10 @@ def check_credentials():
 _cfg = _load_config()
 _rates = _cfg.get('rates', {})
 
+# config.yml is loaded once per process; resolve the flags hot paths check
+SOLAR_ENABLED = bool(_cfg.get('solar', {}).get('enabled', False))
+PLAN_NAME = _rates.get('plan_name', 'Custom')
+
 WINTER_RATES = {
     'peak': _rates.get('winter', {}).get('peak', 0.63),
     'part_peak': _rates.get('winter', {}).get('part_peak', 0.60),
@@ -142,17 +146,18 @@ SUMMER_RATES = {
     'off_peak': _rates.get('summer', {}).get('off_peak', 0.40),
 }
 
-SUMMER_MONTHS = set(_rates.get('summer_months', [6, 7, 8, 9]))
+SUMMER_MONTHS = frozenset(_rates.get('summer_months', [6, 7, 8, 9]))
 
 # TOU period hour sets from config
 _tou = _cfg.get('tou_periods', {})
-_PEAK_HOURS = set(_tou.get('peak', [16, 17, 18, 19, 20]))
-_PART_PEAK_HOURS = set(_tou.get('part_peak', [15, 21, 22, 23]))
+_PEAK_HOURS = frozenset(_tou.get('peak', [16, 17, 18, 19, 20]))
+_PART_PEAK_HOURS = frozenset(_tou.get('part_peak', [15, 21, 22, 23]))
 
 # ==========================================
 # TOU PERIOD DEFINITIONS
 # ==========================================
 
+@lru_cache(maxsize=None)
 def get_tou_period(hour):
     """Get TOU period for a given hour (0-23)."""
     if hour in _PEAK_HOURS:
@@ -162,14 +167,34 @@ def get_tou_period(hour):
     else:
         return 'off_peak'
 
+# Hour (0-23) -> TOU period, precomputed for loops that classify every row
+HOUR_TO_TOU = tuple(get_tou_period(h) for h in range(24))
+
 def is_summer(date):
     """Check if date is in summer season."""
     return date.month in SUMMER_MONTHS
 
+# Month (1-12, index 0 unused) -> season rate dict; get_rate() is called per
+# hour per register in the history builders, so it is a single index.
+_RATES_BY_MONTH = tuple(
+    SUMMER_RATES if m in SUMMER_MONTHS else WINTER_RATES for m in range(13)
+)
+
 def get_rate(date, tou_period):
     """Get the rate for a given date and TOU period."""
-    rates = SUMMER_RATES if is_summer(date) else WINTER_RATES
-    return rates[tou_period]
+    return _RATES_BY_MONTH[date.month][tou_period]
+
+# Hour (0-23) -> (TOU period, $/kWh) for each season, so loops that price
+# every hourly row do one index instead of get_tou_period() + get_rate()
+WINTER_TOU_TABLE = tuple((p, WINTER_RATES[p]) for p in HOUR_TO_TOU)
+SUMMER_TOU_TABLE = tuple((p, SUMMER_RATES[p]) for p in HOUR_TO_TOU)
+_TOU_TABLE_BY_MONTH = tuple(
+    SUMMER_TOU_TABLE if m in SUMMER_MONTHS else WINTER_TOU_TABLE for m in range(13)
+)
+
+def tou_table_for(date):
+    """Get the 24-entry (tou_period, rate) table for the date's season."""
+    return _TOU_TABLE_BY_MONTH[date.month]
 
 # ==========================================
 # REGISTER CONFIGURATION
@@ -6,14 +6,42 @@ Stores fetched data locally for historical trend analysis.
 Uses SQLite for efficient storage and querying.
 """
 
+import atexit
 import sqlite3
 import json
-from datetime import datetime, timedelta
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from itertools import chain
 from pathlib import Path
 from typing import Optional, Dict, List, Any
 
 from config import DATA_DIR, DATA_RETENTION_DAYS
 
+# Every stored row round-trips a JSON blob; use orjson when it is installed
+# (the dashboard image has it). The options match json.dumps behaviour: int
+# keys become strings and datetimes go through default.
+try:
+    import orjson
+
+    def _json_dumps(obj, default=None) -> str:
+        return orjson.dumps(
+            obj, default=default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        ).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+
+# Bind dates and datetimes as the ISO strings stored in the date/datetime
+# columns (the sqlite3 defaults are deprecated, and put a space before the
+# time), so callers pass them straight through instead of str()-ing each one
+sqlite3.register_adapter(datetime, datetime.isoformat)
+sqlite3.register_adapter(date, date.isoformat)
+
 
 def get_db_path() -> Path:
     """Get the path to the SQLite database."""
@@ -21,16 +49,79 @@ def get_db_path() -> Path:
     return DATA_DIR / 'egauge_history.db'
 
 
+# journal_mode=WAL is persistent in the database file, so it only needs to be
+# set once per process; the other pragmas are per-connection.
+_wal_enabled = False
+
+
 def get_connection() -> sqlite3.Connection:
     """Get a database connection with row factory."""
-    conn = sqlite3.connect(get_db_path())
+    global _wal_enabled
+    # Shared across threads by _db(), which serializes access with a lock
+    conn = sqlite3.connect(get_db_path(), check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    if not _wal_enabled:
+        # WAL lets the dashboard read while a report run is writing
+        conn.execute('PRAGMA journal_mode=WAL')
+        _wal_enabled = True
+    # With WAL, NORMAL only syncs at checkpoints and is still crash-safe
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    # 16 MiB page cache (negative = KiB); kept modest for the 512 MB container
+    conn.execute('PRAGMA cache_size=-16384')
     return conn
 
 
+# One writer connection per process, opened on first use: reopening per call
+# made SQLite re-read the schema and re-map the WAL index every time.
+_conn = None
+_conn_lock = threading.RLock()
+
+# Read-only connections, one per thread. WAL readers don't block the writer
+# or each other, so reads skip the writer lock entirely.
+_readers = threading.local()
+
+
+@contextmanager
+def _db():
+    """Yield the shared writer connection, holding the lock for the duration."""
+    global _conn
+    with _conn_lock:
+        if _conn is None:
+            _conn = get_connection()
+            # Take the write lock when a transaction starts rather than on
+            # its first write, so another process's writer can't make the
+            # upgrade fail with SQLITE_BUSY halfway through
+            _conn.isolation_level = 'IMMEDIATE'
+            atexit.register(_conn.close)
+            _create_schema(_conn)
+        yield _conn
+
+
+@contextmanager
+def _read_db():
+    """Yield this thread's read-only connection."""
+    conn = getattr(_readers, 'conn', None)
+    if conn is None:
+        # The file and schema have to exist before it can be opened read-only
+        init_database()
+        conn = sqlite3.connect(
+            f'{get_db_path().resolve().as_uri()}?mode=ro',
+            uri=True, check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        atexit.register(conn.close)
+        _readers.conn = conn
+    yield conn
+
+
 def init_database():
     """Initialize the database schema."""
-    conn = get_connection()
+    with _db():
+        pass
+
+
+def _create_schema(conn: sqlite3.Connection):
     cursor = conn.cursor()
 
     # Hourly consumption data
@@ -42,11 +133,27 @@ def init_database():
             date TEXT NOT NULL,
             hour INTEGER NOT NULL,
             tou_period TEXT NOT NULL,
-            register_data TEXT NOT NULL,
             created_at TEXT DEFAULT CURRENT_TIMESTAMP
         )
     ''')
 
+    # Per-register hourly readings, one row per (hour, register), keyed by
+    # the hour's timestamp
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS registers (
+            id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS register_readings (
+            timestamp INTEGER NOT NULL,
+            register_id INTEGER NOT NULL REFERENCES registers(id),
+            kwh REAL NOT NULL,
+            PRIMARY KEY (timestamp, register_id)
+        ) WITHOUT ROWID
+    ''')
+
     # Daily summaries for faster trend queries
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS daily_summary (
@@ -126,22 +233,51 @@ def init_database():
     except sqlite3.OperationalError:
         pass
 
-    # Create indexes for common queries
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_hourly_timestamp
-        ON hourly_consumption(timestamp)
-    ''')
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_hourly_date
-        ON hourly_consumption(date)
-    ''')
+    _migrate_register_data(cursor)
+
+    # Create indexes for common queries. timestamp and daily_summary.date are
+    # UNIQUE, which already indexes them, so the old single-column copies are
+    # dropped. (date, timestamp) covers the date-range side of the
+    # register_readings join in get_register_history; the readings themselves
+    # are reached through their (timestamp, register_id) primary key.
+    cursor.execute('DROP INDEX IF EXISTS idx_hourly_timestamp')
+    cursor.execute('DROP INDEX IF EXISTS idx_hourly_date')
+    cursor.execute('DROP INDEX IF EXISTS idx_daily_date')
     cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_daily_date
-        ON daily_summary(date)
+        CREATE INDEX IF NOT EXISTS idx_hourly_date_ts
+        ON hourly_consumption(date, timestamp)
     ''')
+    cursor.execute('DROP INDEX IF EXISTS idx_readings_register')
 
     conn.commit()
-    conn.close()
+
+
+def _migrate_register_data(cursor: sqlite3.Cursor):
+    """Move register_data blobs into register_readings, then drop the column."""
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(hourly_consumption)')]
+    if 'register_data' not in columns:
+        return
+
+    # Registers get ids in first-seen order, which get_hourly_data reads back
+    readings = []
+    for timestamp, raw in cursor.execute(
+        'SELECT timestamp, register_data FROM hourly_consumption ORDER BY timestamp'
+    ).fetchall():
+        readings.extend((timestamp, k, v) for k, v in _json_loads(raw).items())
+    _insert_readings(cursor, readings)
+    cursor.execute('ALTER TABLE hourly_consumption DROP COLUMN register_data')
+
+
+def _insert_readings(conn, readings):
+    """Insert (timestamp, register name, kwh) readings, adding new registers."""
+    conn.executemany(
+        'INSERT OR IGNORE INTO registers (name) VALUES (?)',
+        [(name,) for name in dict.fromkeys(r[1] for r in readings)])
+    register_ids = dict(conn.execute('SELECT name, id FROM registers').fetchall())
+    conn.executemany(
+        'INSERT OR IGNORE INTO register_readings (timestamp, register_id, kwh) '
+        'VALUES (?, ?, ?)',
+        [(ts, register_ids[name], kwh) for ts, name, kwh in readings])
 
 
 def store_hourly_data(hourly_data: List[Dict[str, Any]]):
@@ -156,37 +292,45 @@ def store_hourly_data(hourly_data: List[Dict[str, Any]]):
             - tou_period: str ('peak', 'part_peak', 'off_peak')
             - register values as additional keys (e.g., 'CT 14 - Furnace [kWh]': 1.23)
     """
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
-
+    # Register columns (all keys ending in [kWh]), matched once per
+    # distinct key rather than once per hour
+    registers = [
+        k for k in dict.fromkeys(chain.from_iterable(hourly_data))
+        if isinstance(k, str) and k.endswith('[kWh]')
+    ]
+    rows = []
+    readings = []
     for entry in hourly_data:
-        # Extract register data (all keys ending in [kWh])
-        register_data = {
-            k: v for k, v in entry.items()
-            if isinstance(k, str) and k.endswith('[kWh]')
-        }
-
         timestamp = int(entry['datetime'].timestamp())
-
-        try:
-            cursor.execute('''
-                INSERT OR REPLACE INTO hourly_consumption
-                (timestamp, datetime, date, hour, tou_period, register_data)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                timestamp,
-                entry['datetime'].isoformat(),
-                str(entry['date']),
-                entry['hour'],
-                entry['tou_period'],
-                json.dumps(register_data)
-            ))
-        except sqlite3.IntegrityError:
-            pass  # Duplicate timestamp, skip
-
-    conn.commit()
-    conn.close()
+        readings.extend((timestamp, k, entry[k]) for k in registers if k in entry)
+        rows.append((
+            timestamp,
+            entry['datetime'],
+            entry['date'],
+            entry['hour'],
+            entry['tou_period'],
+        ))
+
+    # One executemany in a single transaction. Re-stored hours are updated in
+    # place (upsert) rather than deleted and re-inserted as REPLACE would.
+    with _db() as conn:
+        with conn:
+            conn.executemany('''
+                INSERT INTO hourly_consumption
+                (timestamp, datetime, date, hour, tou_period)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(timestamp) DO UPDATE SET
+                    datetime=excluded.datetime,
+                    date=excluded.date,
+                    hour=excluded.hour,
+                    tou_period=excluded.tou_period
+            ''', rows)
+
+            # A re-stored hour replaces all of its readings
+            conn.executemany(
+                'DELETE FROM register_readings WHERE timestamp = ?',
+                [(row[0],) for row in rows])
+            _insert_readings(conn, readings)
 
 
 def store_daily_summary(date: str, summary: Dict[str, Any]):
@@ -202,55 +346,65 @@ def store_daily_summary(date: str, summary: Dict[str, Any]):
             - off_peak_kwh, off_peak_cost
             - register_totals: dict of register -> kwh
     """
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
+    store_daily_summaries([dict(summary, date=date)])
 
-    cursor.execute('''
-        INSERT OR REPLACE INTO daily_summary
-        (date, total_kwh, total_cost, peak_kwh, peak_cost,
-         part_peak_kwh, part_peak_cost, off_peak_kwh, off_peak_cost, register_totals)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        date,
-        summary['total_kwh'],
-        summary['total_cost'],
-        summary.get('peak_kwh', 0),
-        summary.get('peak_cost', 0),
-        summary.get('part_peak_kwh', 0),
-        summary.get('part_peak_cost', 0),
-        summary.get('off_peak_kwh', 0),
-        summary.get('off_peak_cost', 0),
-        json.dumps(summary.get('register_totals', {}))
-    ))
 
-    conn.commit()
-    conn.close()
+def store_daily_summaries(summaries: List[Dict[str, Any]]):
+    """
+    Store several daily summaries in one transaction.
+
+    Args:
+        summaries: List of summary dictionaries as taken by
+            store_daily_summary, each with its 'date' key (the shape
+            calculate_daily_totals returns)
+    """
+    rows = [
+        (
+            summary['date'],
+            summary['total_kwh'],
+            summary['total_cost'],
+            summary.get('peak_kwh', 0),
+            summary.get('peak_cost', 0),
+            summary.get('part_peak_kwh', 0),
+            summary.get('part_peak_cost', 0),
+            summary.get('off_peak_kwh', 0),
+            summary.get('off_peak_cost', 0),
+            _json_dumps(summary.get('register_totals', {})),
+        )
+        for summary in summaries
+    ]
+
+    with _db() as conn:
+        with conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO daily_summary
+                (date, total_kwh, total_cost, peak_kwh, peak_cost,
+                 part_peak_kwh, part_peak_cost, off_peak_kwh, off_peak_cost, register_totals)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
 
 
 def store_weekly_report(week_start: str, week_end: str,
                         total_kwh: float, total_cost: float,
                         register_stats: Dict, report_text: str = None):
     """Store a weekly report snapshot for trend analysis."""
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
+    with _db() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute('''
-        INSERT INTO weekly_reports
-        (week_start, week_end, total_kwh, total_cost, register_stats, report_text)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (
-        week_start,
-        week_end,
-        total_kwh,
-        total_cost,
-        json.dumps(register_stats, default=str),
-        report_text
-    ))
+        cursor.execute('''
+            INSERT INTO weekly_reports
+            (week_start, week_end, total_kwh, total_cost, register_stats, report_text)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            week_start,
+            week_end,
+            total_kwh,
+            total_cost,
+            _json_dumps(register_stats, default=str),
+            report_text
+        ))
 
-    conn.commit()
-    conn.close()
+        conn.commit()
 
 
 def get_hourly_data(start_date: datetime, end_date: datetime) -> List[Dict]:
@@ -259,35 +413,40 @@ def get_hourly_data(start_date: datetime, end_date: datetime) -> List[Dict]:
 
     Returns list of dictionaries with hourly data.
     """
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT * FROM hourly_consumption
-        WHERE timestamp >= ? AND timestamp < ?
-        ORDER BY timestamp
-    ''', (
-        int(start_date.timestamp()),
-        int(end_date.timestamp())
-    ))
+    with _read_db() as conn:
+        cursor = conn.cursor()
 
-    rows = cursor.fetchall()
-    conn.close()
+        # The datetime column is derivable from timestamp, so it is not read.
+        # One row per (hour, reading); hours with no readings still appear.
+        cursor.execute('''
+            SELECT h.timestamp, h.date, h.hour, h.tou_period, r.name, rr.kwh
+            FROM hourly_consumption h
+            LEFT JOIN register_readings rr ON rr.timestamp = h.timestamp
+            LEFT JOIN registers r ON r.id = rr.register_id
+            WHERE h.timestamp >= ? AND h.timestamp < ?
+            ORDER BY h.timestamp, rr.register_id
+        ''', (
+            int(start_date.timestamp()),
+            int(end_date.timestamp())
+        ))
+
+        rows = cursor.fetchall()
 
     result = []
-    for row in rows:
-        entry = {
-            'timestamp': row['timestamp'],
-            'datetime': datetime.fromisoformat(row['datetime']),
-            'date': row['date'],
-            'hour': row['hour'],
-            'tou_period': row['tou_period'],
-        }
-        # Merge register data
-        register_data = json.loads(row['register_data'])
-        entry.update(register_data)
-        result.append(entry)
+    entry = None
+    for timestamp, date_str, hour, tou_period, name, kwh in rows:
+        if entry is None or entry['timestamp'] != timestamp:
+            entry = {
+                'timestamp': timestamp,
+                'datetime': datetime.fromtimestamp(timestamp),
+                'date': date_str,
+                'hour': hour,
+                'tou_period': tou_period,
+            }
+            result.append(entry)
+        # Merge register readings
+        if name is not None:
+            entry[name] = kwh
 
     return result
 
@@ -302,18 +461,16 @@ def get_daily_summaries(start_date: str, end_date: str) -> List[Dict]:
 
     Returns list of daily summary dictionaries.
     """
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
+    with _read_db() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute('''
-        SELECT * FROM daily_summary
-        WHERE date >= ? AND date <= ?
-        ORDER BY date
-    ''', (start_date, end_date))
+        cursor.execute('''
+            SELECT * FROM daily_summary
+            WHERE date >= ? AND date <= ?
+            ORDER BY date
+        ''', (start_date, end_date))
 
-    rows = cursor.fetchall()
-    conn.close()
+        rows = cursor.fetchall()
 
     result = []
     for row in rows:
@@ -327,7 +484,7 @@ def get_daily_summaries(start_date: str, end_date: str) -> List[Dict]:
             'part_peak_cost': row['part_peak_cost'],
             'off_peak_kwh': row['off_peak_kwh'],
             'off_peak_cost': row['off_peak_cost'],
-            'register_totals': json.loads(row['register_totals']),
+            'register_totals': _json_loads(row['register_totals']),
         })
 
     return result
@@ -342,23 +499,21 @@ def get_previous_week_stats(current_week_start: datetime) -> Optional[Dict]:
 
     Returns dictionary with previous week stats, or None if not available.
     """
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
+    with _read_db() as conn:
+        cursor = conn.cursor()
 
-    # Look for a weekly report from around 7 days ago
-    prev_week_end = current_week_start - timedelta(days=1)
-    prev_week_start = prev_week_end - timedelta(days=6)
+        # Look for a weekly report from around 7 days ago
+        prev_week_end = current_week_start - timedelta(days=1)
+        prev_week_start = prev_week_end - timedelta(days=6)
 
-    cursor.execute('''
-        SELECT * FROM weekly_reports
-        WHERE week_start <= ? AND week_end >= ?
-        ORDER BY week_end DESC
-        LIMIT 1
-    ''', (str(prev_week_start.date()), str(prev_week_start.date())))
+        cursor.execute('''
+            SELECT * FROM weekly_reports
+            WHERE week_start <= ? AND week_end >= ?
+            ORDER BY week_end DESC
+            LIMIT 1
+        ''', (prev_week_start.date(), prev_week_start.date()))
 
-    row = cursor.fetchone()
-    conn.close()
+        row = cursor.fetchone()
 
     if row:
         return {
@@ -366,7 +521,7 @@ def get_previous_week_stats(current_week_start: datetime) -> Optional[Dict]:
             'week_end': row['week_end'],
             'total_kwh': row['total_kwh'],
             'total_cost': row['total_cost'],
-            'register_stats': json.loads(row['register_stats']),
+            'register_stats': _json_loads(row['register_stats']),
         }
 
     return None
@@ -378,24 +533,22 @@ def get_historical_averages(days: int = 30) -> Optional[Dict]:
 
     Returns dictionary with average daily consumption and cost.
     """
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
+    with _read_db() as conn:
+        cursor = conn.cursor()
 
-    end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=days)
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=days)
 
-    cursor.execute('''
-        SELECT
-            AVG(total_kwh) as avg_kwh,
-            AVG(total_cost) as avg_cost,
-            COUNT(*) as days_count
-        FROM daily_summary
-        WHERE date >= ? AND date <= ?
-    ''', (str(start_date), str(end_date)))
+        cursor.execute('''
+            SELECT
+                AVG(total_kwh) as avg_kwh,
+                AVG(total_cost) as avg_cost,
+                COUNT(*) as days_count
+            FROM daily_summary
+            WHERE date >= ? AND date <= ?
+        ''', (start_date, end_date))
 
-    row = cursor.fetchone()
-    conn.close()
+        row = cursor.fetchone()
 
     if row and row['days_count'] > 0:
         return {
@@ -409,26 +562,36 @@ def get_historical_averages(days: int = 30) -> Optional[Dict]:
 
 def cleanup_old_data():
     """Remove data older than DATA_RETENTION_DAYS."""
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
+    with _db() as conn:
+        cursor = conn.cursor()
 
-    cutoff = datetime.now() - timedelta(days=DATA_RETENTION_DAYS)
-    cutoff_timestamp = int(cutoff.timestamp())
-    cutoff_date = str(cutoff.date())
+        cutoff = datetime.now() - timedelta(days=DATA_RETENTION_DAYS)
+        cutoff_timestamp = int(cutoff.timestamp())
+        cutoff_date = cutoff.date()
 
-    cursor.execute('''
-        DELETE FROM hourly_consumption WHERE timestamp < ?
-    ''', (cutoff_timestamp,))
+        cursor.execute('''
+            DELETE FROM hourly_consumption WHERE timestamp < ?
+        ''', (cutoff_timestamp,))
 
-    cursor.execute('''
-        DELETE FROM daily_summary WHERE date < ?
-    ''', (cutoff_date,))
+        cursor.execute('''
+            DELETE FROM register_readings WHERE timestamp < ?
+        ''', (cutoff_timestamp,))
 
-    deleted_hourly = cursor.rowcount
+        cursor.execute('''
+            DELETE FROM daily_summary WHERE date < ?
+        ''', (cutoff_date,))
 
-    conn.commit()
-    conn.close()
+        deleted_hourly = cursor.rowcount
+
+        conn.commit()
+
+        # Runs after each ingest: refresh planner statistics for tables whose
+        # row counts have shifted, so range scans keep picking the indexes
+        cursor.execute('PRAGMA optimize')
+        # Fold the WAL back into the database so it doesn't grow across runs.
+        # Pages freed by the deletes stay in the file and are reused by the
+        # next ingest, since retention keeps the row count steady.
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
 
     return deleted_hourly
 
@@ -443,32 +606,28 @@ def get_register_history(register_name: str, days: int = 30) -> List[Dict]:
 
     Returns list of {date, kwh} dictionaries.
     """
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
+    with _read_db() as conn:
+        cursor = conn.cursor()
 
-    end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=days)
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=days)
 
-    cursor.execute('''
-        SELECT date, register_totals FROM daily_summary
-        WHERE date >= ? AND date <= ?
-        ORDER BY date
-    ''', (str(start_date), str(end_date)))
+        # CROSS JOIN keeps hourly_consumption as the outer loop: the date
+        # index narrows the hours and each reading is a primary-key seek
+        cursor.execute('''
+            SELECT h.date AS date, SUM(rr.kwh) AS kwh
+            FROM hourly_consumption h
+            CROSS JOIN register_readings rr
+                ON rr.timestamp = h.timestamp
+                AND rr.register_id = (SELECT id FROM registers WHERE name = ?)
+            WHERE h.date >= ? AND h.date <= ?
+            GROUP BY h.date
+            ORDER BY h.date
+        ''', (register_name, start_date, end_date))
 
-    rows = cursor.fetchall()
-    conn.close()
+        rows = cursor.fetchall()
 
-    result = []
-    for row in rows:
-        register_totals = json.loads(row['register_totals'])
-        if register_name in register_totals:
-            result.append({
-                'date': row['date'],
-                'kwh': register_totals[register_name],
-            })
-
-    return result
+    return [{'date': row['date'], 'kwh': row['kwh']} for row in rows]
 
 
 def store_monthly_billing(month, nem_charges=0, generation_charges=0, fixed_charges=0,
@@ -476,116 +635,106 @@ def store_monthly_billing(month, nem_charges=0, generation_charges=0, fixed_char
                           grid_cost=0, export_credit=0, net_energy_cost=0,
                           base_charge=0, total_bill=0, days=0):
     """Store or update a monthly billing snapshot."""
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO monthly_billing
-            (month, nem_charges, generation_charges, fixed_charges,
-             grid_import_kwh, grid_export_kwh, net_kwh,
-             grid_cost, export_credit, net_energy_cost, base_charge, total_bill, days, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        ON CONFLICT(month) DO UPDATE SET
-            nem_charges=excluded.nem_charges,
-            generation_charges=excluded.generation_charges,
-            fixed_charges=excluded.fixed_charges,
-            grid_import_kwh=excluded.grid_import_kwh,
-            grid_export_kwh=excluded.grid_export_kwh,
-            net_kwh=excluded.net_kwh,
-            grid_cost=excluded.grid_cost,
-            export_credit=excluded.export_credit,
-            net_energy_cost=excluded.net_energy_cost,
-            base_charge=excluded.base_charge,
-            total_bill=excluded.total_bill,
-            days=excluded.days,
-            updated_at=CURRENT_TIMESTAMP
-    ''', (month, nem_charges, generation_charges, fixed_charges,
-          grid_import_kwh, grid_export_kwh, net_kwh,
-          grid_cost, export_credit, net_energy_cost, base_charge, total_bill, days))
-    conn.commit()
-    conn.close()
+    with _db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO monthly_billing
+                (month, nem_charges, generation_charges, fixed_charges,
+                 grid_import_kwh, grid_export_kwh, net_kwh,
+                 grid_cost, export_credit, net_energy_cost, base_charge, total_bill, days, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(month) DO UPDATE SET
+                nem_charges=excluded.nem_charges,
+                generation_charges=excluded.generation_charges,
+                fixed_charges=excluded.fixed_charges,
+                grid_import_kwh=excluded.grid_import_kwh,
+                grid_export_kwh=excluded.grid_export_kwh,
+                net_kwh=excluded.net_kwh,
+                grid_cost=excluded.grid_cost,
+                export_credit=excluded.export_credit,
+                net_energy_cost=excluded.net_energy_cost,
+                base_charge=excluded.base_charge,
+                total_bill=excluded.total_bill,
+                days=excluded.days,
+                updated_at=CURRENT_TIMESTAMP
+        ''', (month, nem_charges, generation_charges, fixed_charges,
+              grid_import_kwh, grid_export_kwh, net_kwh,
+              grid_cost, export_credit, net_energy_cost, base_charge, total_bill, days))
+        conn.commit()
 
 
 def get_monthly_billing(since_month=None):
     """Get monthly billing snapshots, optionally filtered by start month."""
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
-    if since_month:
-        cursor.execute('SELECT * FROM monthly_billing WHERE month >= ? ORDER BY month', (since_month,))
-    else:
-        cursor.execute('SELECT * FROM monthly_billing ORDER BY month')
-    rows = cursor.fetchall()
-    conn.close()
+    with _read_db() as conn:
+        cursor = conn.cursor()
+        if since_month:
+            cursor.execute('SELECT * FROM monthly_billing WHERE month >= ? ORDER BY month', (since_month,))
+        else:
+            cursor.execute('SELECT * FROM monthly_billing ORDER BY month')
+        rows = cursor.fetchall()
     return [dict(row) for row in rows]
 
 
 def update_actual_bill(month, amount):
     """Record actual PG&E bill amount for accuracy comparison."""
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE monthly_billing SET actual_bill = ?, updated_at = CURRENT_TIMESTAMP
-        WHERE month = ?
-    ''', (amount, month))
-    if cursor.rowcount == 0:
-        # No snapshot exists yet for this month, create a minimal one
+    with _db() as conn:
+        cursor = conn.cursor()
         cursor.execute('''
-            INSERT INTO monthly_billing (month, grid_cost, export_credit, net_energy_cost, base_charge, total_bill, actual_bill, days)
-            VALUES (?, 0, 0, 0, 0, 0, ?, 0)
-        ''', (month, amount))
-    conn.commit()
-    conn.close()
+            UPDATE monthly_billing SET actual_bill = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE month = ?
+        ''', (amount, month))
+        if cursor.rowcount == 0:
+            # No snapshot exists yet for this month, create a minimal one
+            cursor.execute('''
+                INSERT INTO monthly_billing (month, grid_cost, export_credit, net_energy_cost, base_charge, total_bill, actual_bill, days)
+                VALUES (?, 0, 0, 0, 0, 0, ?, 0)
+            ''', (month, amount))
+        conn.commit()
 
 
 def update_actual_electric(month, electric_amount):
     """Record actual electric bill amount (excluding gas) for comparison."""
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE monthly_billing SET actual_electric = ?, updated_at = CURRENT_TIMESTAMP
-        WHERE month = ?
-    ''', (electric_amount, month))
-    if cursor.rowcount == 0:
+    with _db() as conn:
+        cursor = conn.cursor()
         cursor.execute('''
-            INSERT INTO monthly_billing (month, grid_cost, export_credit, net_energy_cost, base_charge, total_bill, actual_electric, days)
-            VALUES (?, 0, 0, 0, 0, 0, ?, 0)
-        ''', (month, electric_amount))
-    conn.commit()
-    conn.close()
+            UPDATE monthly_billing SET actual_electric = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE month = ?
+        ''', (electric_amount, month))
+        if cursor.rowcount == 0:
+            cursor.execute('''
+                INSERT INTO monthly_billing (month, grid_cost, export_credit, net_energy_cost, base_charge, total_bill, actual_electric, days)
+                VALUES (?, 0, 0, 0, 0, 0, ?, 0)
+            ''', (month, electric_amount))
+        conn.commit()
 
 
 def log_billing_audit(month, estimated, actual_bill=None, actual_electric=None, prediction_data=None):
     """Log billing estimate vs actual for accuracy tracking."""
-    init_database()
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS billing_audit (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            month TEXT NOT NULL,
-            estimated_nem REAL,
-            estimated_generation REAL,
-            estimated_monthly REAL,
-            actual_bill REAL,
-            actual_electric REAL,
-            prediction_data TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    cursor.execute('''
-        INSERT INTO billing_audit (month, estimated_nem, estimated_generation, estimated_monthly, actual_bill, actual_electric, prediction_data)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (month,
-          estimated.get('nem_charges_to_date', 0),
-          estimated.get('generation_charges_to_date', 0),
-          estimated.get('monthly_electric_bill_to_date', 0),
-          actual_bill, actual_electric,
-          json.dumps(prediction_data) if prediction_data else None))
-    conn.commit()
-    conn.close()
+    with _db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS billing_audit (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                month TEXT NOT NULL,
+                estimated_nem REAL,
+                estimated_generation REAL,
+                estimated_monthly REAL,
+                actual_bill REAL,
+                actual_electric REAL,
+                prediction_data TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            INSERT INTO billing_audit (month, estimated_nem, estimated_generation, estimated_monthly, actual_bill, actual_electric, prediction_data)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (month,
+              estimated.get('nem_charges_to_date', 0),
+              estimated.get('generation_charges_to_date', 0),
+              estimated.get('monthly_electric_bill_to_date', 0),
+              actual_bill, actual_electric,
+              _json_dumps(prediction_data) if prediction_data else None))
+        conn.commit()
 
 
 # Initialize database on module import
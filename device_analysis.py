@@ -4,17 +4,19 @@ Device-specific analysis utilities for eGauge Energy Analysis Toolkit.
 Provides functions for analyzing individual circuits/registers.
 """
 
-import subprocess
+import base64
 import csv
+import urllib.request
 from datetime import datetime, timedelta
 from io import StringIO
 from collections import defaultdict
+from operator import sub
 from typing import Dict, List, Tuple, Optional
 
 from config import (
     EGAUGE_URL, EGAUGE_USER, EGAUGE_PASSWORD,
     WINTER_RATES, SUMMER_RATES, EXCLUDE_REGISTERS,
-    check_credentials, get_tou_period, is_summer, get_rate,
+    check_credentials, HOUR_TO_TOU, is_summer, get_rate,
     DEVICE_REGISTERS
 )
 
@@ -24,21 +26,29 @@ def fetch_data(days: int = 7) -> str:
     check_credentials()
 
     n_rows = days * 24
-    cmd = [
-        'curl', '-s', '-u', f'{EGAUGE_USER}:{EGAUGE_PASSWORD}',
-        f'{EGAUGE_URL}/cgi-bin/egauge-show?c&h&n={n_rows}'
-    ]
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-    return result.stdout
+    credentials = base64.b64encode(f'{EGAUGE_USER}:{EGAUGE_PASSWORD}'.encode()).decode()
+    req = urllib.request.Request(
+        f'{EGAUGE_URL}/cgi-bin/egauge-show?c&h&n={n_rows}',
+        headers={'Authorization': f'Basic {credentials}'},
+    )
+    with urllib.request.urlopen(req, timeout=60) as resp:
+        return resp.read().decode()
 
 
 def parse_and_calculate_hourly(csv_data: str) -> List[Dict]:
     """Parse CSV data and calculate hourly consumption values."""
-    reader = csv.DictReader(StringIO(csv_data))
+    reader = csv.reader(StringIO(csv_data))
+    header = next(reader, None)
+    if header is None:
+        return []
+    ts_col = header.index('Date & Time')
+    value_cols = [(i, key) for i, key in enumerate(header) if key != 'Date & Time']
     data = []
 
     for row in reader:
-        timestamp = int(row['Date & Time'])
+        if not row:
+            continue
+        timestamp = int(row[ts_col])
         dt = datetime.fromtimestamp(timestamp)
 
         parsed_row = {
@@ -46,38 +56,47 @@ def parse_and_calculate_hourly(csv_data: str) -> List[Dict]:
             'datetime': dt,
             'hour': dt.hour,
             'date': dt.date(),
-            'tou_period': get_tou_period(dt.hour),
+            'tou_period': HOUR_TO_TOU[dt.hour],
         }
 
-        for key, value in row.items():
-            if key != 'Date & Time':
-                try:
-                    parsed_row[key] = float(value)
-                except ValueError:
-                    parsed_row[key] = 0.0
+        for i, key in value_cols:
+            try:
+                parsed_row[key] = float(row[i])
+            except ValueError:
+                parsed_row[key] = 0.0
 
         data.append(parsed_row)
 
-    data.sort(key=lambda x: x['timestamp'])
+    # Oldest first. eGauge returns rows newest-first, so a reverse is
+    # usually enough; only sort if the rows come back out of order.
+    if data and data[0]['timestamp'] > data[-1]['timestamp']:
+        data.reverse()
+    if any(a['timestamp'] > b['timestamp'] for a, b in zip(data, data[1:])):
+        data.sort(key=lambda x: x['timestamp'])
 
-    # Calculate hourly consumption
+    # Calculate hourly consumption, one register column at a time
     hourly = []
-    for i in range(1, len(data)):
-        prev = data[i-1]
-        curr = data[i]
+    if len(data) < 2:
+        return hourly
+
+    kwh_keys = [
+        key for key in data[-1]
+        if key.endswith('[kWh]') and key not in EXCLUDE_REGISTERS
+    ]
+    diffs = []
+    for key in kwh_keys:
+        column = [row[key] for row in data]
+        diffs.append(list(map(abs, map(sub, column[1:], column[:-1]))))
+    hour_kwhs = zip(*diffs) if diffs else [()] * (len(data) - 1)
 
+    for curr, kwhs in zip(data[1:], hour_kwhs):
         hour_consumption = {
             'datetime': curr['datetime'],
             'date': curr['date'],
             'hour': curr['hour'],
             'tou_period': curr['tou_period'],
         }
-
-        for key in curr.keys():
-            if key.endswith('[kWh]') and key not in EXCLUDE_REGISTERS:
-                consumption = abs(curr[key] - prev[key])
-                hour_consumption[key] = consumption
-
+        hour_consumption.update(zip(kwh_keys, kwhs))
         hourly.append(hour_consumption)
 
     return hourly
@@ -114,6 +133,12 @@ def get_register_stats(
         'by_hour': defaultdict(list),
     }
 
+    # Accumulate in locals and bound containers; the loop runs once per hour
+    by_tou = stats['by_tou']
+    by_day = stats['by_day']
+    by_hour = stats['by_hour']
+    total_kwh = 0
+    total_cost = 0
     for hour in hourly_data:
         if register_name in hour:
             kwh = hour[register_name]
@@ -121,12 +146,15 @@ def get_register_stats(
             rate = get_rate(hour['datetime'], tou_period)
             cost = kwh * rate
 
-            stats['total_kwh'] += kwh
-            stats['total_cost'] += cost
-            stats['by_tou'][tou_period]['kwh'] += kwh
-            stats['by_tou'][tou_period]['cost'] += cost
-            stats['by_day'][hour['date']] += kwh
-            stats['by_hour'][hour['hour']].append(kwh)
+            total_kwh += kwh
+            total_cost += cost
+            tou = by_tou[tou_period]
+            tou['kwh'] += kwh
+            tou['cost'] += cost
+            by_day[hour['date']] += kwh
+            by_hour[hour['hour']].append(kwh)
+    stats['total_kwh'] = total_kwh
+    stats['total_cost'] = total_cost
 
     # Calculate percentages
     total = stats['total_kwh']
@@ -15,12 +15,17 @@ Usage:
 """
 
 import argparse
+import base64
 import csv
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from collections import defaultdict
-import subprocess
+from itertools import chain
 import sys
+import urllib.error
+import urllib.request
 from io import StringIO
+from operator import sub
 from pathlib import Path
 
 # Import from centralized config
@@ -28,13 +33,13 @@ from config import (
     EGAUGE_URL, EGAUGE_USER, EGAUGE_PASSWORD,
     WINTER_RATES, SUMMER_RATES, EXCLUDE_REGISTERS,
     FURNACE_DAILY_THRESHOLD_KWH, HIGH_PEAK_USAGE_PERCENT,
-    check_credentials, get_tou_period, is_summer, get_rate,
+    check_credentials, HOUR_TO_TOU, is_summer, get_rate,
     REPORTS_DIR
 )
 
 # Import data persistence
 from data_store import (
-    store_hourly_data, store_daily_summary, store_weekly_report,
+    store_hourly_data, store_daily_summaries, store_weekly_report,
     get_previous_week_stats, get_historical_averages, cleanup_old_data
 )
 
@@ -52,15 +57,18 @@ def fetch_egauge_data(days=7):
     # Fetch hourly data (n parameter = number of rows)
     n_rows = days * 24
 
-    cmd = [
-        'curl', '-s', '-u', f'{EGAUGE_USER}:{EGAUGE_PASSWORD}',
-        f'{EGAUGE_URL}/cgi-bin/egauge-show?c&h&n={n_rows}'
-    ]
+    # Request in-process rather than forking curl for every fetch; the
+    # Basic auth header is sent up front, as curl -u does
+    credentials = base64.b64encode(f'{EGAUGE_USER}:{EGAUGE_PASSWORD}'.encode()).decode()
+    req = urllib.request.Request(
+        f'{EGAUGE_URL}/cgi-bin/egauge-show?c&h&n={n_rows}',
+        headers={'Authorization': f'Basic {credentials}'},
+    )
 
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            return resp.read().decode()
+    except (urllib.error.URLError, OSError) as e:
         print(f"Error fetching data: {e}")
         sys.exit(1)
 
@@ -69,12 +77,21 @@ def parse_csv_data(csv_data):
     Parse CSV data from eGauge.
     Returns list of dicts with timestamp and register values.
     """
-    reader = csv.DictReader(StringIO(csv_data))
+    reader = csv.reader(StringIO(csv_data))
+    header = next(reader, None)
+    if header is None:
+        return []
+    # Resolve column positions once from the header instead of building a
+    # dict per row with DictReader
+    ts_col = header.index('Date & Time')
+    value_cols = [(i, key) for i, key in enumerate(header) if key != 'Date & Time']
     data = []
 
     for row in reader:
+        if not row:
+            continue
         # Parse timestamp
-        timestamp = int(row['Date & Time'])
+        timestamp = int(row[ts_col])
         dt = datetime.fromtimestamp(timestamp)
 
         # Parse register values (they're cumulative, so we'll diff them)
@@ -83,21 +100,24 @@ def parse_csv_data(csv_data):
             'datetime': dt,
             'hour': dt.hour,
             'date': dt.date(),
-            'tou_period': get_tou_period(dt.hour),
+            'tou_period': HOUR_TO_TOU[dt.hour],
         }
 
         # Get all register values
-        for key, value in row.items():
-            if key != 'Date & Time':
-                try:
-                    parsed_row[key] = float(value)
-                except ValueError:
-                    parsed_row[key] = 0.0
+        for i, key in value_cols:
+            try:
+                parsed_row[key] = float(row[i])
+            except ValueError:
+                parsed_row[key] = 0.0
 
         data.append(parsed_row)
 
-    # Sort by timestamp (oldest first)
-    data.sort(key=lambda x: x['timestamp'])
+    # Oldest first. eGauge returns rows newest-first, so a reverse is
+    # usually enough; only sort if the rows come back out of order.
+    if data and data[0]['timestamp'] > data[-1]['timestamp']:
+        data.reverse()
+    if any(a['timestamp'] > b['timestamp'] for a, b in zip(data, data[1:])):
+        data.sort(key=lambda x: x['timestamp'])
     return data
 
 def calculate_hourly_consumption(data):
@@ -107,11 +127,24 @@ def calculate_hourly_consumption(data):
     Negative cumulative values mean consumption.
     """
     hourly_data = []
+    if len(data) < 2:
+        return hourly_data
 
-    for i in range(1, len(data)):
-        prev = data[i-1]
-        curr = data[i]
+    # Every row comes from the same CSV header, so pick the registers once
+    kwh_keys = [
+        key for key in data[-1]
+        if key.endswith('[kWh]') and key not in EXCLUDE_REGISTERS
+    ]
 
+    # Consumption is the absolute difference (registers count down). Diff
+    # each register's column in one pass, then transpose back to rows.
+    diffs = []
+    for key in kwh_keys:
+        column = [row[key] for row in data]
+        diffs.append(list(map(abs, map(sub, column[1:], column[:-1]))))
+    hour_kwhs = zip(*diffs) if diffs else [()] * (len(data) - 1)
+
+    for prev, kwhs in zip(data, hour_kwhs):
         # Use prev (start of period) for TOU classification —
         # consumption between two timestamps belongs to the start hour's TOU period
         hour_consumption = {
@@ -120,14 +153,7 @@ def calculate_hourly_consumption(data):
             'hour': prev['hour'],
             'tou_period': prev['tou_period'],
         }
-
-        # Calculate consumption for each register
-        for key in curr.keys():
-            if key.endswith('[kWh]') and key not in EXCLUDE_REGISTERS:
-                # Consumption is the absolute difference (registers count down)
-                consumption = abs(curr[key] - prev[key])
-                hour_consumption[key] = consumption
-
+        hour_consumption.update(zip(kwh_keys, kwhs))
         hourly_data.append(hour_consumption)
 
     return hourly_data
@@ -136,11 +162,46 @@ def calculate_hourly_consumption(data):
 # Analysis
 # ==========================================
 
+_TOU_PERIODS = ('peak', 'part_peak', 'off_peak')
+_TOU_INDEX = {period: i for i, period in enumerate(_TOU_PERIODS)}
+
+def _hourly_columns(hourly_data):
+    """
+    Lay hourly_data out as parallel per-hour lists.
+
+    Returns (dates, tou_periods, rates, registers): the first three have one
+    entry per hour, registers lists the [kWh] keys in first-seen order.
+    """
+    dates = [hour['date'] for hour in hourly_data]
+    tou_periods = [hour['tou_period'] for hour in hourly_data]
+    rates = [get_rate(hour['datetime'], hour['tou_period']) for hour in hourly_data]
+    # chain walks the keys in C, so only the distinct names get endswith()
+    registers = [
+        key for key in dict.fromkeys(chain.from_iterable(hourly_data))
+        if key.endswith('[kWh]')
+    ]
+    return dates, tou_periods, rates, registers
+
+def analyze_all(hourly_data, days):
+    """
+    Run analyze_data and calculate_daily_totals over one column layout.
+
+    Returns (register_stats, daily_totals).
+    """
+    columns = _hourly_columns(hourly_data)
+    return (
+        _analyze_columns(hourly_data, columns, days),
+        _daily_totals_columns(hourly_data, columns),
+    )
+
 def analyze_data(hourly_data, days):
     """
     Analyze hourly data and generate statistics.
     """
-    # Initialize accumulators
+    return _analyze_columns(hourly_data, _hourly_columns(hourly_data), days)
+
+def _analyze_columns(hourly_data, columns, days):
+    # Missing registers still read as empty stats, as callers expect
     register_stats = defaultdict(lambda: {
         'total_kwh': 0,
         'total_cost': 0,
@@ -152,35 +213,55 @@ def analyze_data(hourly_data, days):
         'by_day': defaultdict(float),
     })
 
-    # Accumulate data
-    for hour in hourly_data:
-        date = hour['date']
-        tou_period = hour['tou_period']
-        rate = get_rate(hour['datetime'], tou_period)
-
-        for key, kwh in hour.items():
-            if key.endswith('[kWh]'):
-                register_stats[key]['total_kwh'] += kwh
-                cost = kwh * rate
-                register_stats[key]['total_cost'] += cost
-                register_stats[key]['by_tou'][tou_period]['kwh'] += kwh
-                register_stats[key]['by_tou'][tou_period]['cost'] += cost
-                register_stats[key]['by_day'][date] += kwh
-
-    # Calculate percentages and averages
-    for register, stats in register_stats.items():
-        total = stats['total_kwh']
-        if total > 0:
-            for period in ['peak', 'part_peak', 'off_peak']:
-                stats['by_tou'][period]['percent'] = (stats['by_tou'][period]['kwh'] / total) * 100
-
-        stats['avg_daily_kwh'] = total / days
-        stats['avg_daily_cost'] = stats['total_cost'] / days
+    # The date, TOU period and rate are shared by every register in an hour,
+    # so they were resolved once per hour up front
+    dates, tou_periods, rates, registers = columns
+    tou_indexes = [_TOU_INDEX[tou_period] for tou_period in tou_periods]
+
+    # Accumulate one register at a time, walking its column of hourly values
+    # into flat per-period sums (indexed in _TOU_PERIODS order); the nested
+    # stats dict is built once at the end
+    for key in registers:
+        tou_kwh = [0] * len(_TOU_PERIODS)
+        tou_cost = [0] * len(_TOU_PERIODS)
+        by_day = defaultdict(float)
+        total_kwh = 0
+        total_cost = 0
+        for hour, date, tou, rate in zip(hourly_data, dates, tou_indexes, rates):
+            kwh = hour.get(key)
+            if kwh is None:
+                continue
+            cost = kwh * rate
+            total_kwh += kwh
+            total_cost += cost
+            tou_kwh[tou] += kwh
+            tou_cost[tou] += cost
+            by_day[date] += kwh
+
+        # Calculate percentages and averages
+        register_stats[key] = {
+            'total_kwh': total_kwh,
+            'total_cost': total_cost,
+            'by_tou': {
+                period: {
+                    'kwh': tou_kwh[i],
+                    'cost': tou_cost[i],
+                    'percent': (tou_kwh[i] / total_kwh) * 100 if total_kwh > 0 else 0,
+                }
+                for i, period in enumerate(_TOU_PERIODS)
+            },
+            'by_day': by_day,
+            'avg_daily_kwh': total_kwh / days,
+            'avg_daily_cost': total_cost / days,
+        }
 
     return register_stats
 
 def calculate_daily_totals(hourly_data):
     """Calculate daily totals for each day in the data."""
+    return _daily_totals_columns(hourly_data, _hourly_columns(hourly_data))
+
+def _daily_totals_columns(hourly_data, columns):
     daily_totals = defaultdict(lambda: {
         'total_kwh': 0,
         'total_cost': 0,
@@ -193,25 +274,31 @@ def calculate_daily_totals(hourly_data):
         'register_totals': defaultdict(float),
     })
 
-    for hour in hourly_data:
-        date = str(hour['date'])
-        tou_period = hour['tou_period']
-        rate = get_rate(hour['datetime'], tou_period)
-
-        for key, kwh in hour.items():
-            if key.endswith('[kWh]'):
-                cost = kwh * rate
-                daily_totals[date]['total_kwh'] += kwh
-                daily_totals[date]['total_cost'] += cost
-                daily_totals[date][f'{tou_period}_kwh'] += kwh
-                daily_totals[date][f'{tou_period}_cost'] += cost
-                daily_totals[date]['register_totals'][key] += kwh
+    dates, tou_periods, rates, registers = columns
+
+    # Keyed by the raw date; str() runs once per day when building the result
+    for hour, date, tou_period, rate in zip(hourly_data, dates, tou_periods, rates):
+        day = daily_totals[date]
+        register_totals = day['register_totals']
+        kwh_key = f'{tou_period}_kwh'
+        cost_key = f'{tou_period}_cost'
+
+        for key in registers:
+            kwh = hour.get(key)
+            if kwh is None:
+                continue
+            cost = kwh * rate
+            day['total_kwh'] += kwh
+            day['total_cost'] += cost
+            day[kwh_key] += kwh
+            day[cost_key] += cost
+            register_totals[key] += kwh
 
     # Convert to list format
     result = []
     for date, data in sorted(daily_totals.items()):
         result.append({
-            'date': date,
+            'date': str(date),
             'total_kwh': data['total_kwh'],
             'total_cost': data['total_cost'],
             'peak_kwh': data['peak_kwh'],
@@ -229,20 +316,33 @@ def calculate_daily_totals(hourly_data):
 # Report Generation
 # ==========================================
 
+# Row layouts for the per-register tables, formatted once per register/period
+_SUMMARY_ROW = (
+    "{name:<45} {total_kwh:>12.2f} ${total_cost:>11.2f} "
+    "{avg_daily_kwh:>12.2f} ${avg_daily_cost:>11.2f}"
+)
+_PERIOD_ROW = "{:<15} {:>12.2f} ${:>11.2f} {:>11.1f}% ${:>11.4f}"
+_PERIOD_NAMES = tuple((p, p.replace('_', '-').title()) for p in _TOU_PERIODS)
+
+# Section separators; the report is laid out for 100 columns
+_SEP_EQ = "=" * 100
+_SEP_DASH = "-" * 100
+
 def generate_trend_section(current_stats, previous_week, historical_avg):
     """Generate the trend comparison section of the report."""
     lines = []
-    lines.append("")
-    lines.append("TREND ANALYSIS")
-    lines.append("=" * 100)
+    w = lines.append
+    w("")
+    w("TREND ANALYSIS")
+    w(_SEP_EQ)
 
     current_total_kwh = sum(s['total_kwh'] for s in current_stats.values())
     current_total_cost = sum(s['total_cost'] for s in current_stats.values())
 
     if previous_week:
-        lines.append("")
-        lines.append("Week-over-Week Comparison:")
-        lines.append("-" * 100)
+        w("")
+        w("Week-over-Week Comparison:")
+        w(_SEP_DASH)
 
         prev_kwh = previous_week['total_kwh']
         prev_cost = previous_week['total_cost']
@@ -255,29 +355,29 @@ def generate_trend_section(current_stats, previous_week, historical_avg):
         arrow_kwh = "^" if kwh_change > 0 else "v" if kwh_change < 0 else "="
         arrow_cost = "^" if cost_change > 0 else "v" if cost_change < 0 else "="
 
-        lines.append(f"  {'Metric':<20} {'Previous':>15} {'Current':>15} {'Change':>15} {'%':>10}")
-        lines.append("-" * 100)
-        lines.append(f"  {'Energy (kWh)':<20} {prev_kwh:>15.2f} {current_total_kwh:>15.2f} {kwh_change:>+14.2f}{arrow_kwh} {kwh_pct:>+9.1f}%")
-        lines.append(f"  {'Cost ($)':<20} ${prev_cost:>14.2f} ${current_total_cost:>14.2f} ${cost_change:>+13.2f}{arrow_cost} {cost_pct:>+9.1f}%")
+        w(f"  {'Metric':<20} {'Previous':>15} {'Current':>15} {'Change':>15} {'%':>10}")
+        w(_SEP_DASH)
+        w(f"  {'Energy (kWh)':<20} {prev_kwh:>15.2f} {current_total_kwh:>15.2f} {kwh_change:>+14.2f}{arrow_kwh} {kwh_pct:>+9.1f}%")
+        w(f"  {'Cost ($)':<20} ${prev_cost:>14.2f} ${current_total_cost:>14.2f} ${cost_change:>+13.2f}{arrow_cost} {cost_pct:>+9.1f}%")
 
         # Highlight significant changes
         if abs(kwh_pct) > 20:
             if kwh_change > 0:
-                lines.append("")
-                lines.append(f"  ! ALERT: Energy usage INCREASED by {kwh_pct:.1f}% vs last week")
+                w("")
+                w(f"  ! ALERT: Energy usage INCREASED by {kwh_pct:.1f}% vs last week")
             else:
-                lines.append("")
-                lines.append(f"  * GOOD: Energy usage DECREASED by {abs(kwh_pct):.1f}% vs last week")
+                w("")
+                w(f"  * GOOD: Energy usage DECREASED by {abs(kwh_pct):.1f}% vs last week")
 
     else:
-        lines.append("")
-        lines.append("  (No previous week data available for comparison)")
-        lines.append("  Historical comparisons will be available after the next report.")
+        w("")
+        w("  (No previous week data available for comparison)")
+        w("  Historical comparisons will be available after the next report.")
 
     if historical_avg:
-        lines.append("")
-        lines.append(f"30-Day Historical Average ({historical_avg['days_analyzed']} days of data):")
-        lines.append("-" * 100)
+        w("")
+        w(f"30-Day Historical Average ({historical_avg['days_analyzed']} days of data):")
+        w(_SEP_DASH)
 
         avg_kwh = historical_avg['avg_daily_kwh']
         avg_cost = historical_avg['avg_daily_cost']
@@ -287,10 +387,10 @@ def generate_trend_section(current_stats, previous_week, historical_avg):
         kwh_vs_avg = current_daily_kwh - avg_kwh
         cost_vs_avg = current_daily_cost - avg_cost
 
-        lines.append(f"  {'Metric':<20} {'30-Day Avg':>15} {'This Week':>15} {'Difference':>15}")
-        lines.append("-" * 100)
-        lines.append(f"  {'Daily kWh':<20} {avg_kwh:>15.2f} {current_daily_kwh:>15.2f} {kwh_vs_avg:>+15.2f}")
-        lines.append(f"  {'Daily Cost':<20} ${avg_cost:>14.2f} ${current_daily_cost:>14.2f} ${cost_vs_avg:>+14.2f}")
+        w(f"  {'Metric':<20} {'30-Day Avg':>15} {'This Week':>15} {'Difference':>15}")
+        w(_SEP_DASH)
+        w(f"  {'Daily kWh':<20} {avg_kwh:>15.2f} {current_daily_kwh:>15.2f} {kwh_vs_avg:>+15.2f}")
+        w(f"  {'Daily Cost':<20} ${avg_cost:>14.2f} ${current_daily_cost:>14.2f} ${cost_vs_avg:>+14.2f}")
 
     return "\n".join(lines)
 
@@ -304,79 +404,76 @@ def generate_report(register_stats, days, previous_week=None, historical_avg=Non
         key=lambda x: x[1]['total_cost'],
         reverse=True
     )
+    # (display name, stats, peak-period stats) per register, shared by every
+    # section below instead of re-deriving them in each loop
+    ranked = [
+        (register.replace(' [kWh]', ''), stats, stats['by_tou']['peak'])
+        for register, stats in sorted_registers
+    ]
 
     report = []
-    report.append("=" * 100)
-    report.append(f"eGauge Energy Analysis Report - Last {days} Days")
-    report.append(f"Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    report.append("=" * 100)
-    report.append("")
+    w = report.append
+    w(_SEP_EQ)
+    w(f"eGauge Energy Analysis Report - Last {days} Days")
+    w(f"Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    w(_SEP_EQ)
+    w("")
 
     # Summary table
-    report.append("SUMMARY - Ranked by Total Cost")
-    report.append("-" * 100)
-    report.append(f"{'Register':<45} {'Total kWh':>12} {'Total Cost':>12} {'Avg/Day':>12} {'$/Day':>12}")
-    report.append("-" * 100)
+    w("SUMMARY - Ranked by Total Cost")
+    w(_SEP_DASH)
+    w(f"{'Register':<45} {'Total kWh':>12} {'Total Cost':>12} {'Avg/Day':>12} {'$/Day':>12}")
+    w(_SEP_DASH)
 
     total_kwh = 0
     total_cost = 0
 
-    for register, stats in sorted_registers:
-        name = register.replace(' [kWh]', '')
-        report.append(
-            f"{name:<45} {stats['total_kwh']:>12.2f} "
-            f"${stats['total_cost']:>11.2f} {stats['avg_daily_kwh']:>12.2f} "
-            f"${stats['avg_daily_cost']:>11.2f}"
-        )
+    for name, stats, _ in ranked:
+        w(_SUMMARY_ROW.format(name=name, **stats))
         total_kwh += stats['total_kwh']
         total_cost += stats['total_cost']
 
-    report.append("-" * 100)
-    report.append(f"{'TOTAL':<45} {total_kwh:>12.2f} ${total_cost:>11.2f}")
-    report.append("")
+    w(_SEP_DASH)
+    w(f"{'TOTAL':<45} {total_kwh:>12.2f} ${total_cost:>11.2f}")
+    w("")
 
     # Add trend analysis section
     if previous_week or historical_avg:
-        report.append(generate_trend_section(register_stats, previous_week, historical_avg))
+        w(generate_trend_section(register_stats, previous_week, historical_avg))
 
     # Detailed breakdown by TOU period
-    report.append("")
-    report.append("")
-    report.append("DETAILED BREAKDOWN BY TIME-OF-USE PERIOD")
-    report.append("=" * 100)
-
-    for register, stats in sorted_registers:
-        name = register.replace(' [kWh]', '')
-        report.append("")
-        report.append(f"{name}")
-        report.append("-" * 100)
-        report.append(f"{'Period':<15} {'kWh':>12} {'Cost':>12} {'% of Total':>12} {'Avg Rate':>12}")
-        report.append("-" * 100)
-
-        for period in ['peak', 'part_peak', 'off_peak']:
+    w("")
+    w("")
+    w("DETAILED BREAKDOWN BY TIME-OF-USE PERIOD")
+    w(_SEP_EQ)
+
+    for name, stats, _ in ranked:
+        w("")
+        w(f"{name}")
+        w(_SEP_DASH)
+        w(f"{'Period':<15} {'kWh':>12} {'Cost':>12} {'% of Total':>12} {'Avg Rate':>12}")
+        w(_SEP_DASH)
+
+        for period, period_name in _PERIOD_NAMES:
             period_data = stats['by_tou'][period]
             kwh = period_data['kwh']
             cost = period_data['cost']
-            percent = period_data['percent']
             avg_rate = cost / kwh if kwh > 0 else 0
-
-            period_name = period.replace('_', '-').title()
-            report.append(
-                f"{period_name:<15} {kwh:>12.2f} ${cost:>11.2f} "
-                f"{percent:>11.1f}% ${avg_rate:>11.4f}"
+            w(
+                _PERIOD_ROW.format(period_name, kwh, cost, period_data['percent'], avg_rate)
             )
 
-        report.append("-" * 100)
-        report.append(
+        w(_SEP_DASH)
+        w(
             f"{'TOTAL':<15} {stats['total_kwh']:>12.2f} ${stats['total_cost']:>11.2f} "
             f"{100.0:>11.1f}%"
         )
 
     # Alerts section
-    report.append("")
-    report.append("")
-    report.append("ALERTS & RECOMMENDATIONS")
-    report.append("=" * 100)
+    w("")
+    w("")
+    w("ALERTS & RECOMMENDATIONS")
+    w(_SEP_EQ)
 
     alerts = []
 
@@ -391,55 +488,54 @@ def generate_report(register_stats, days, previous_week=None, historical_avg=Non
             )
 
     # Check for high peak usage
-    for register, stats in sorted_registers:
-        peak_percent = stats['by_tou']['peak']['percent']
+    for name, _, peak in ranked:
+        peak_percent = peak['percent']
         if peak_percent > HIGH_PEAK_USAGE_PERCENT:
-            name = register.replace(' [kWh]', '')
             alerts.append(
                 f"!! {name}: {peak_percent:.1f}% usage during PEAK hours "
-                f"(${stats['by_tou']['peak']['cost']:.2f})"
+                f"(${peak['cost']:.2f})"
             )
 
     # Find most expensive time-shifters
-    report.append("")
-    report.append("Potential Savings from Time-Shifting:")
-    report.append("-" * 100)
+    w("")
+    w("Potential Savings from Time-Shifting:")
+    w(_SEP_DASH)
 
-    for register, stats in sorted_registers[:5]:  # Top 5 by cost
-        name = register.replace(' [kWh]', '')
-        peak_kwh = stats['by_tou']['peak']['kwh']
-        peak_cost = stats['by_tou']['peak']['cost']
+    # Savings per kWh if peak usage was shifted to off-peak (same for every register)
+    now = datetime.now()
+    rate_delta = get_rate(now, 'peak') - get_rate(now, 'off_peak')
+
+    for name, _, peak in ranked[:5]:  # Top 5 by cost
+        peak_kwh = peak['kwh']
 
         if peak_kwh > 0:
             # Calculate savings if peak usage was shifted to off-peak
-            peak_rate = get_rate(datetime.now(), 'peak')
-            offpeak_rate = get_rate(datetime.now(), 'off_peak')
-            potential_savings = peak_kwh * (peak_rate - offpeak_rate)
+            potential_savings = peak_kwh * rate_delta
 
             if potential_savings > 1:  # Only show if >$1 potential savings
-                report.append(
+                w(
                     f"{name:<45} Peak: {peak_kwh:>8.1f} kWh "
                     f"-> Potential savings: ${potential_savings:>6.2f}/week"
                 )
 
     if alerts:
-        report.append("")
-        report.append("Active Alerts:")
-        report.append("-" * 100)
+        w("")
+        w("Active Alerts:")
+        w(_SEP_DASH)
         for alert in alerts:
-            report.append(alert)
+            w(alert)
     else:
-        report.append("")
-        report.append("[OK] No alerts - all consumption within normal parameters")
-
-    report.append("")
-    report.append("=" * 100)
-    report.append("")
-    report.append("TOU Period Definitions:")
-    report.append("  Peak: 4:00 PM - 9:00 PM (highest rates)")
-    report.append("  Part-Peak: 3:00 PM - 4:00 PM and 9:00 PM - 12:00 AM (medium rates)")
-    report.append("  Off-Peak: 12:00 AM - 3:00 PM (lowest rates)")
-    report.append("")
+        w("")
+        w("[OK] No alerts - all consumption within normal parameters")
+
+    w("")
+    w(_SEP_EQ)
+    w("")
+    w("TOU Period Definitions:")
+    w("  Peak: 4:00 PM - 9:00 PM (highest rates)")
+    w("  Part-Peak: 3:00 PM - 4:00 PM and 9:00 PM - 12:00 AM (medium rates)")
+    w("  Off-Peak: 12:00 AM - 3:00 PM (lowest rates)")
+    w("")
 
     return "\n".join(report)
 
@@ -492,80 +588,86 @@ def main():
     hourly_data = calculate_hourly_consumption(data)
 
     print("Analyzing consumption patterns...")
-    register_stats = analyze_data(hourly_data, args.days)
-
-    # Calculate daily totals
-    daily_data = calculate_daily_totals(hourly_data)
-
-    # Store data for historical tracking
-    if not args.no_store:
-        print("Storing data for historical analysis...")
-        store_hourly_data(hourly_data)
-        for day in daily_data:
-            store_daily_summary(day['date'], day)
-        cleanup_old_data()
-
-    # Get historical data for trend analysis
-    print("Loading historical data for comparison...")
-    start_date = datetime.now() - timedelta(days=args.days)
-    previous_week = get_previous_week_stats(start_date)
-    historical_avg = get_historical_averages(30)
-
-    print("Generating report...")
-    report = generate_report(register_stats, args.days, previous_week, historical_avg)
-
-    # Store weekly report
-    if not args.no_store:
-        total_kwh = sum(s['total_kwh'] for s in register_stats.values())
-        total_cost = sum(s['total_cost'] for s in register_stats.values())
-        week_start = (datetime.now() - timedelta(days=args.days)).strftime('%Y-%m-%d')
-        week_end = datetime.now().strftime('%Y-%m-%d')
-
-        # Convert register_stats for JSON storage
-        stats_for_storage = {}
-        for reg, stats in register_stats.items():
-            stats_for_storage[reg] = {
-                'total_kwh': stats['total_kwh'],
-                'total_cost': stats['total_cost'],
-                'avg_daily_kwh': stats['avg_daily_kwh'],
-                'avg_daily_cost': stats['avg_daily_cost'],
-                'by_tou': stats['by_tou'],
+    # Per-register stats and daily totals in one call over shared columns
+    register_stats, daily_data = analyze_all(hourly_data, args.days)
+
+    # Solar data comes from Home Assistant over the network; fetch and blend
+    # it in the background while the database, report and charts are built.
+    with ThreadPoolExecutor(max_workers=1) as solar_executor:
+        solar_future = None
+        if args.solar:
+            try:
+                from solar_integration import run_blended_report
+                solar_future = solar_executor.submit(run_blended_report, hourly_data, args.days)
+            except ImportError as e:
+                print(f"Warning: Could not import solar_integration: {e}")
+
+        # Store data for historical tracking
+        if not args.no_store:
+            print("Storing data for historical analysis...")
+            store_hourly_data(hourly_data)
+            store_daily_summaries(daily_data)
+            cleanup_old_data()
+
+        # Get historical data for trend analysis
+        print("Loading historical data for comparison...")
+        start_date = datetime.now() - timedelta(days=args.days)
+        previous_week = get_previous_week_stats(start_date)
+        historical_avg = get_historical_averages(30)
+
+        print("Generating report...")
+        report = generate_report(register_stats, args.days, previous_week, historical_avg)
+
+        # Store weekly report
+        if not args.no_store:
+            total_kwh = sum(s['total_kwh'] for s in register_stats.values())
+            total_cost = sum(s['total_cost'] for s in register_stats.values())
+            week_start = (datetime.now() - timedelta(days=args.days)).strftime('%Y-%m-%d')
+            week_end = datetime.now().strftime('%Y-%m-%d')
+
+            # Convert register_stats for JSON storage
+            stats_for_storage = {
+                reg: {
+                    'total_kwh': stats['total_kwh'],
+                    'total_cost': stats['total_cost'],
+                    'avg_daily_kwh': stats['avg_daily_kwh'],
+                    'avg_daily_cost': stats['avg_daily_cost'],
+                    'by_tou': stats['by_tou'],
+                }
+                for reg, stats in register_stats.items()
             }
 
-        store_weekly_report(week_start, week_end, total_kwh, total_cost,
-                           stats_for_storage, report)
-
-    # Generate charts if requested
-    chart_paths = []
-    if args.charts:
-        try:
-            from visualization import generate_all_charts
-            print("Generating charts...")
-            chart_paths = generate_all_charts(
-                register_stats,
-                daily_data=daily_data,
-                previous_period=previous_week,
-                days=args.days
-            )
-            if chart_paths:
-                print(f"Charts saved to: {chart_paths[0].parent}")
-        except ImportError:
-            print("Warning: Could not import visualization module. Skipping charts.")
-
-    # Run solar integration if requested
-    solar_report = None
-    solar_system = None
-    solar_blended = None
-    if args.solar:
-        try:
-            from solar_integration import run_blended_report
-            solar_report, solar_system, solar_blended = run_blended_report(hourly_data, args.days)
-            if solar_report:
-                report = solar_report + "\n\n" + report
-        except ImportError as e:
-            print(f"Warning: Could not import solar_integration: {e}")
-        except Exception as e:
-            print(f"Warning: Solar integration failed: {e}")
+            store_weekly_report(week_start, week_end, total_kwh, total_cost,
+                               stats_for_storage, report)
+
+        # Generate charts if requested
+        chart_paths = []
+        if args.charts:
+            try:
+                from visualization import generate_all_charts
+                print("Generating charts...")
+                chart_paths = generate_all_charts(
+                    register_stats,
+                    daily_data=daily_data,
+                    previous_period=previous_week,
+                    days=args.days
+                )
+                if chart_paths:
+                    print(f"Charts saved to: {chart_paths[0].parent}")
+            except ImportError:
+                print("Warning: Could not import visualization module. Skipping charts.")
+
+        # Collect solar integration results if requested
+        solar_report = None
+        solar_system = None
+        solar_blended = None
+        if solar_future is not None:
+            try:
+                solar_report, solar_system, solar_blended = solar_future.result()
+                if solar_report:
+                    report = solar_report + "\n\n" + report
+            except Exception as e:
+                print(f"Warning: Solar integration failed: {e}")
 
     # Save or print report
     if args.output:
@@ -579,7 +681,8 @@ def main():
     else:
         print("\n" + report)
 
-    # Generate HTML report if requested
+    # Generate HTML report if requested (reused for the email body)
+    html = None
     if args.html:
         try:
             from html_report import generate_html_report
@@ -617,6 +720,7 @@ def main():
                 daily_data=daily_data,
                 solar_system=solar_system,
                 solar_register_stats=dict(solar_blended) if solar_blended else None,
+                html_body=html,
             ):
                 print("Email sent successfully!")
         except ImportError:
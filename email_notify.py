@@ -4,11 +4,13 @@ Email notification module for eGauge Energy Analysis Toolkit.
 Sends reports via SMTP with HTML formatting and optional attachments.
 """
 
+import mimetypes
 import smtplib
+from contextlib import contextmanager
+from email.mime.application import MIMEApplication
+from email.mime.image import MIMEImage
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
 from pathlib import Path
 from typing import List, Optional
 
@@ -28,12 +30,48 @@ def is_email_configured() -> bool:
     return True
 
 
+@contextmanager
+def smtp_session():
+    """
+    Open an authenticated SMTP connection for one or more sends.
+
+    The connection is closed with QUIT on exit, including on errors.
+    Pass the yielded server to send_report() to reuse it.
+    """
+    with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30) as server:
+        if SMTP_USE_TLS:
+            server.starttls()
+        if SMTP_USER and SMTP_PASSWORD:
+            server.login(SMTP_USER, SMTP_PASSWORD)
+        yield server
+
+
+def _attachment_part(filepath: Path):
+    """Build a base64-encoded MIME part for a file attachment."""
+    ctype, _ = mimetypes.guess_type(filepath.name)
+    maintype, _, subtype = (ctype or 'application/octet-stream').partition('/')
+    if maintype == 'image':
+        part = MIMEImage(filepath.read_bytes(), subtype, name=filepath.name)
+    else:
+        part = MIMEApplication(filepath.read_bytes(), name=filepath.name)
+    part.add_header('Content-Disposition', 'attachment', filename=filepath.name)
+    return part
+
+
+def _attach_all(msg: MIMEMultipart, attachments: List[Path]) -> None:
+    """Attach each existing file in attachments to msg."""
+    for filepath in attachments:
+        if filepath.exists():
+            msg.attach(_attachment_part(filepath))
+
+
 def send_report(
     subject: str,
     body: str,
     attachments: Optional[List[Path]] = None,
     to_address: Optional[str] = None,
-    html_body: Optional[str] = None
+    html_body: Optional[str] = None,
+    server: Optional[smtplib.SMTP] = None
 ) -> bool:
     """
     Send an email report.
@@ -44,6 +82,7 @@ def send_report(
         attachments: List of file paths to attach (e.g., charts)
         to_address: Override recipient address
         html_body: HTML version of the email body
+        server: Open connection from smtp_session() to reuse
 
     Returns True if sent successfully, False otherwise.
     """
@@ -58,74 +97,37 @@ def send_report(
     if html_body:
         # Multipart message with both HTML and plain text
         msg = MIMEMultipart('alternative')
-        msg['Subject'] = subject
-        msg['From'] = sender
-        msg['To'] = recipient
 
         # Plain text version (fallback)
-        text_part = MIMEText(body, 'plain', 'utf-8')
-        msg.attach(text_part)
+        msg.attach(MIMEText(body, 'plain', 'utf-8'))
 
         # HTML version (preferred)
-        html_part = MIMEText(html_body, 'html', 'utf-8')
-        msg.attach(html_part)
+        msg.attach(MIMEText(html_body, 'html', 'utf-8'))
 
         # If we have attachments, we need to wrap in a mixed container
         if attachments:
             outer = MIMEMultipart('mixed')
-            outer['Subject'] = subject
-            outer['From'] = sender
-            outer['To'] = recipient
             outer.attach(msg)
-
-            for filepath in attachments:
-                if not filepath.exists():
-                    continue
-                with open(filepath, 'rb') as f:
-                    part = MIMEBase('application', 'octet-stream')
-                    part.set_payload(f.read())
-                    encoders.encode_base64(part)
-                    part.add_header(
-                        'Content-Disposition',
-                        f'attachment; filename="{filepath.name}"'
-                    )
-                    outer.attach(part)
             msg = outer
     else:
         # Plain text only
         msg = MIMEMultipart()
-        msg['Subject'] = subject
-        msg['From'] = sender
-        msg['To'] = recipient
         msg.attach(MIMEText(body, 'plain'))
 
-        if attachments:
-            for filepath in attachments:
-                if not filepath.exists():
-                    continue
-                with open(filepath, 'rb') as f:
-                    part = MIMEBase('application', 'octet-stream')
-                    part.set_payload(f.read())
-                    encoders.encode_base64(part)
-                    part.add_header(
-                        'Content-Disposition',
-                        f'attachment; filename="{filepath.name}"'
-                    )
-                    msg.attach(part)
+    msg['Subject'] = subject
+    msg['From'] = sender
+    msg['To'] = recipient
+
+    if attachments:
+        _attach_all(msg, attachments)
 
     # Send email
     try:
-        if SMTP_USE_TLS:
-            server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30)
-            server.starttls()
+        if server is not None:
+            server.sendmail(sender, [recipient], msg.as_string())
         else:
-            server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30)
-
-        if SMTP_USER and SMTP_PASSWORD:
-            server.login(SMTP_USER, SMTP_PASSWORD)
-
-        server.sendmail(sender, [recipient], msg.as_string())
-        server.quit()
+            with smtp_session() as server:
+                server.sendmail(sender, [recipient], msg.as_string())
 
         print(f"Email sent successfully to {recipient}")
         return True
@@ -149,7 +151,8 @@ def send_html_report(
     html_body: str,
     plain_text_fallback: str,
     attachments: Optional[List[Path]] = None,
-    to_address: Optional[str] = None
+    to_address: Optional[str] = None,
+    server: Optional[smtplib.SMTP] = None
 ) -> bool:
     """
     Send an HTML email report with plain text fallback.
@@ -160,6 +163,7 @@ def send_html_report(
         plain_text_fallback: Plain text version for email clients that don't support HTML
         attachments: Optional file attachments
         to_address: Override recipient
+        server: Open connection from smtp_session() to reuse
 
     Returns True if sent successfully.
     """
@@ -168,7 +172,8 @@ def send_html_report(
         body=plain_text_fallback,
         attachments=attachments,
         to_address=to_address,
-        html_body=html_body
+        html_body=html_body,
+        server=server
     )
 
 
@@ -177,7 +182,8 @@ def send_alert(
     message: str,
     to_address: Optional[str] = None,
     alert_type: str = 'warning',
-    details: Optional[dict] = None
+    details: Optional[dict] = None,
+    server: Optional[smtplib.SMTP] = None
 ) -> bool:
     """
     Send an alert email with HTML formatting.
@@ -188,6 +194,7 @@ def send_alert(
         to_address: Override recipient address
         alert_type: 'warning', 'danger', or 'info'
         details: Optional dict of additional details to display
+        server: Open connection from smtp_session() to reuse
 
     Returns True if sent successfully, False otherwise.
     """
@@ -200,14 +207,16 @@ def send_alert(
             body=message,
             attachments=None,
             to_address=to_address,
-            html_body=html
+            html_body=html,
+            server=server
         )
     except ImportError:
         return send_report(
             subject=f"[ALERT] {subject}",
             body=message,
             attachments=None,
-            to_address=to_address
+            to_address=to_address,
+            server=server
         )
 
 
@@ -222,6 +231,8 @@ def send_weekly_report(
     daily_data: Optional[list] = None,
     solar_system: Optional[dict] = None,
     solar_register_stats: Optional[dict] = None,
+    html_body: Optional[str] = None,
+    server: Optional[smtplib.SMTP] = None,
 ) -> bool:
     """
     Send the weekly energy report with HTML formatting.
@@ -235,14 +246,15 @@ def send_weekly_report(
         previous_week: Previous week stats for trends
         historical_avg: Historical average data
         daily_data: Daily totals data
+        html_body: Pre-rendered HTML body; generated from register_stats if omitted
+        server: Open connection from smtp_session() to reuse
 
     Returns True if sent successfully, False otherwise.
     """
     from datetime import datetime
     date_str = week_date or datetime.now().strftime('%Y-%m-%d')
 
-    html_body = None
-    if register_stats:
+    if html_body is None and register_stats:
         try:
             from html_report import generate_html_report
             html_body = generate_html_report(
@@ -261,5 +273,6 @@ def send_weekly_report(
         subject=f"⚡ Weekly Energy Report - {date_str}",
         body=report_text,
         attachments=chart_paths,
-        html_body=html_body
+        html_body=html_body,
+        server=server
     )
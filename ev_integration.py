@@ -15,7 +15,14 @@ import os
 import subprocess
 from datetime import datetime, timedelta
 
-from config import get_tou_period, get_rate, get_config
+from config import HOUR_TO_TOU, get_tou_period, get_rate, get_config
+
+# HA /api/states and /api/history responses can be megabytes; parse them with
+# orjson when it is installed (the dashboard image has it)
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 # ==========================================
 # Configuration
@@ -83,7 +90,7 @@ def fetch_ev_live():
 
     try:
         result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=15)
-        states = json.loads(result.stdout)
+        states = _json_loads(result.stdout)
     except (subprocess.CalledProcessError, json.JSONDecodeError, subprocess.TimeoutExpired):
         return None
 
@@ -169,7 +176,7 @@ def fetch_ev_history(entity_id, days=7):
 
     try:
         result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=60)
-        data = json.loads(result.stdout)
+        data = _json_loads(result.stdout)
         if data and len(data) > 0:
             return data[0]
         return []
@@ -332,7 +339,7 @@ def _finalize_session(session_data, end_dt):
         kwh = wh / 1000
         total_wh += wh
 
-        tou = get_tou_period(dt_prev.hour)
+        tou = HOUR_TO_TOU[dt_prev.hour]
         rate = get_rate(dt_prev, tou)
         cost += kwh * rate
         tou_kwh[tou] += kwh
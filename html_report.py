@@ -29,6 +29,38 @@ COLORS = {
 }
 
 
+# Invariant report fragments, rendered from COLORS once at import
+_REPORT_HEAD = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>eGauge Energy Report</title>
+</head>
+<body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; line-height: 1.5; color: {COLORS['dark']}; background: {COLORS['light']}; margin: 0; padding: 20px;">
+    <div style="max-width: 600px; margin: 0 auto; background: {COLORS['white']}; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); overflow: hidden;">
+"""
+
+_REPORT_FOOTER = f"""        <!-- Footer -->
+        <div style="background: {COLORS['light']}; padding: 16px 20px; text-align: center; font-size: 11px; color: {COLORS['muted']};">
+            <div>Generated by eGauge Energy Analysis Toolkit</div>
+            <div style="margin-top: 4px;">Peak: 4-9pm | Part-Peak: 3-4pm, 9pm-12am | Off-Peak: 12am-3pm</div>
+            <div style="margin-top: 8px;"><a href="https://energy.zosia.io" style="color: {COLORS['primary']}; text-decoration: none;">View Live Dashboard &rarr;</a></div>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+_ALL_CLEAR_HTML = f"""
+        <div style="background: {COLORS['success']}15; border-left: 4px solid {COLORS['success']}; padding: 12px; margin: 24px 0; border-radius: 0 4px 4px 0;">
+            <div style="font-weight: 600; color: {COLORS['success']};">✓ All Clear</div>
+            <div style="color: {COLORS['dark']}; font-size: 13px;">No alerts - consumption within normal parameters</div>
+        </div>
+        """
+
+
 def format_currency(value: float) -> str:
     """Format value as currency."""
     return f"${value:,.2f}"
@@ -91,6 +123,19 @@ def generate_html_report(
 ) -> str:
     """Generate a complete HTML email report."""
 
+    # Bind palette entries to locals; the templates below use them heavily
+    c_primary = COLORS['primary']
+    c_success = COLORS['success']
+    c_warning = COLORS['warning']
+    c_danger = COLORS['danger']
+    c_muted = COLORS['muted']
+    c_light = COLORS['light']
+    c_dark = COLORS['dark']
+    c_white = COLORS['white']
+    c_peak = COLORS['peak']
+    c_part_peak = COLORS['part_peak']
+    c_off_peak = COLORS['off_peak']
+
     # Sort registers by cost (grid cost when solar available, else full rate)
     def _sort_cost(item):
         reg_name, stats = item
@@ -104,15 +149,27 @@ def generate_html_report(
         reverse=True
     )
 
-    total_kwh = sum(s['total_kwh'] for s in register_stats.values())
-    total_cost = sum(s['total_cost'] for s in register_stats.values())
+    # Overall and per-TOU totals in one pass over the registers
+    total_kwh = total_cost = 0
+    total_peak_kwh = total_part_peak_kwh = total_off_peak_kwh = 0
+    total_peak_cost = total_part_peak_cost = total_off_peak_cost = 0
+    for s in register_stats.values():
+        by_tou = s['by_tou']
+        peak, part_peak, off_peak = by_tou['peak'], by_tou['part_peak'], by_tou['off_peak']
+        total_kwh += s['total_kwh']
+        total_cost += s['total_cost']
+        total_peak_kwh += peak['kwh']
+        total_part_peak_kwh += part_peak['kwh']
+        total_off_peak_kwh += off_peak['kwh']
+        total_peak_cost += peak['cost']
+        total_part_peak_cost += part_peak['cost']
+        total_off_peak_cost += off_peak['cost']
     avg_daily_kwh = total_kwh / days
     avg_daily_cost = total_cost / days
 
     # Energy grade
     grade_score = 70
-    total_peak_kwh_all = sum(s['by_tou']['peak']['kwh'] for s in register_stats.values())
-    peak_usage_pct = (total_peak_kwh_all / total_kwh * 100) if total_kwh > 0 else 0
+    peak_usage_pct = (total_peak_kwh / total_kwh * 100) if total_kwh > 0 else 0
     if peak_usage_pct < 15:
         grade_score += 15
     elif peak_usage_pct < 25:
@@ -133,13 +190,13 @@ def generate_html_report(
             elif self_suff > 15:
                 grade_score += 5
     if grade_score >= 90:
-        grade_letter, grade_color = 'A', COLORS['success']
+        grade_letter, grade_color = 'A', c_success
     elif grade_score >= 80:
-        grade_letter, grade_color = 'B', COLORS['primary']
+        grade_letter, grade_color = 'B', c_primary
     elif grade_score >= 65:
-        grade_letter, grade_color = 'C', COLORS['warning']
+        grade_letter, grade_color = 'C', c_warning
     else:
-        grade_letter, grade_color = 'D', COLORS['danger']
+        grade_letter, grade_color = 'D', c_danger
 
     grade_html = f'<span style="background: {grade_color}; color: white; padding: 4px 10px; border-radius: 4px; font-size: 16px; font-weight: 800; margin-left: 8px;">{grade_letter}</span>'
 
@@ -164,7 +221,7 @@ def generate_html_report(
         # Use actual HA battery discharge data
         sol_battery_kwh = solar_system.get('total_battery_discharge_kwh', 0)
         sol_savings = total_cost - sol_net
-        suff_color = COLORS['success'] if sol_self_suff > 40 else COLORS['warning'] if sol_self_suff > 20 else COLORS['muted']
+        suff_color = c_success if sol_self_suff > 40 else c_warning if sol_self_suff > 20 else c_muted
 
         # Source mix percentages
         total_supply = sol_kwh + sol_grid_in + sol_battery_kwh
@@ -175,28 +232,28 @@ def generate_html_report(
         solar_html = f"""
         <!-- Source Mix -->
         <div style="margin: 0 20px 16px;">
-            <h3 style="margin: 0 0 10px; color: {COLORS['dark']}; font-size: 14px;">Energy Source Mix</h3>
+            <h3 style="margin: 0 0 10px; color: {c_dark}; font-size: 14px;">Energy Source Mix</h3>
             <div style="display: flex; height: 28px; border-radius: 6px; overflow: hidden; margin-bottom: 6px;">
                 <div style="width: {solar_pct}%; background: #eab308; min-width: {1 if solar_pct > 0 else 0}px;" title="Solar"></div>
-                <div style="width: {battery_pct}%; background: {COLORS['success']}; min-width: {1 if battery_pct > 0 else 0}px;" title="Battery"></div>
-                <div style="width: {grid_pct}%; background: {COLORS['danger']}; min-width: {1 if grid_pct > 0 else 0}px;" title="Grid"></div>
+                <div style="width: {battery_pct}%; background: {c_success}; min-width: {1 if battery_pct > 0 else 0}px;" title="Battery"></div>
+                <div style="width: {grid_pct}%; background: {c_danger}; min-width: {1 if grid_pct > 0 else 0}px;" title="Grid"></div>
             </div>
             <table style="width: 100%; font-size: 12px;">
                 <tr>
                     <td>
                         <span style="display: inline-block; width: 10px; height: 10px; background: #eab308; border-radius: 2px; margin-right: 4px;"></span>
                         Solar {solar_pct:.0f}%
-                        <span style="color: {COLORS['muted']};">({sol_kwh:.0f} kWh)</span>
+                        <span style="color: {c_muted};">({sol_kwh:.0f} kWh)</span>
                     </td>
                     <td style="text-align: center;">
-                        <span style="display: inline-block; width: 10px; height: 10px; background: {COLORS['success']}; border-radius: 2px; margin-right: 4px;"></span>
+                        <span style="display: inline-block; width: 10px; height: 10px; background: {c_success}; border-radius: 2px; margin-right: 4px;"></span>
                         Battery {battery_pct:.0f}%
-                        <span style="color: {COLORS['muted']};">({sol_battery_kwh:.0f} kWh)</span>
+                        <span style="color: {c_muted};">({sol_battery_kwh:.0f} kWh)</span>
                     </td>
                     <td style="text-align: right;">
-                        <span style="display: inline-block; width: 10px; height: 10px; background: {COLORS['danger']}; border-radius: 2px; margin-right: 4px;"></span>
+                        <span style="display: inline-block; width: 10px; height: 10px; background: {c_danger}; border-radius: 2px; margin-right: 4px;"></span>
                         Grid {grid_pct:.0f}%
-                        <span style="color: {COLORS['muted']};">({sol_grid_in:.0f} kWh)</span>
+                        <span style="color: {c_muted};">({sol_grid_in:.0f} kWh)</span>
                     </td>
                 </tr>
             </table>
@@ -208,19 +265,19 @@ def generate_html_report(
                 <tr>
                     <td style="text-align: center; padding: 6px;">
                         <div style="font-size: 22px; font-weight: 700; color: {suff_color};">{sol_self_suff:.0f}%</div>
-                        <div style="font-size: 11px; color: {COLORS['muted']};">Self-Sufficiency</div>
+                        <div style="font-size: 11px; color: {c_muted};">Self-Sufficiency</div>
                     </td>
                     <td style="text-align: center; padding: 6px;">
-                        <div style="font-size: 22px; font-weight: 700; color: {COLORS['success']};">{format_currency(sol_savings)}</div>
-                        <div style="font-size: 11px; color: {COLORS['muted']};">Solar + Battery Savings</div>
+                        <div style="font-size: 22px; font-weight: 700; color: {c_success};">{format_currency(sol_savings)}</div>
+                        <div style="font-size: 11px; color: {c_muted};">Solar + Battery Savings</div>
                     </td>
                     <td style="text-align: center; padding: 6px;">
-                        <div style="font-size: 22px; font-weight: 700; color: {COLORS['dark']};">{format_currency(sol_export_cr)}</div>
-                        <div style="font-size: 11px; color: {COLORS['muted']};">Export Credits</div>
+                        <div style="font-size: 22px; font-weight: 700; color: {c_dark};">{format_currency(sol_export_cr)}</div>
+                        <div style="font-size: 11px; color: {c_muted};">Export Credits</div>
                     </td>
                 </tr>
             </table>
-            <div style="margin-top: 8px; font-size: 12px; color: {COLORS['muted']}; text-align: center;">
+            <div style="margin-top: 8px; font-size: 12px; color: {c_muted}; text-align: center;">
                 Grid cost: {format_currency(sol_grid_cost)} &middot; Export: {sol_grid_out:.0f} kWh &middot; Net: {format_currency(sol_net)}
                 &middot; Est. monthly savings: ~{format_currency(sol_savings / days * 30)}
             </div>
@@ -230,15 +287,15 @@ def generate_html_report(
     # Optimization opportunities
     opps_html = ""
     opps = []
+    now = datetime.now()
+    rate_delta = get_rate(now, 'peak') - get_rate(now, 'off_peak')
     for register, stats in sorted_registers:
         peak_pct_val = stats['by_tou']['peak']['percent']
         peak_cost_val = stats['by_tou']['peak']['cost']
         if peak_pct_val > 20 and peak_cost_val > 1.0:
             opp_name = register.replace(' [kWh]', '')
             peak_kwh_val = stats['by_tou']['peak']['kwh']
-            peak_rate = get_rate(datetime.now(), 'peak')
-            offpeak_rate = get_rate(datetime.now(), 'off_peak')
-            potential = peak_kwh_val * (peak_rate - offpeak_rate)
+            potential = peak_kwh_val * rate_delta
             grid_factor = 1.0
             if solar_register_stats and register in solar_register_stats:
                 sr = solar_register_stats[register]
@@ -250,30 +307,32 @@ def generate_html_report(
     opps.sort(key=lambda x: x['savings'], reverse=True)
 
     if opps:
-        opp_items = ""
+        opp_parts = []
         for opp in opps[:5]:
             coverage = ''
             if opp['grid_factor'] < 0.5:
-                coverage = f' <span style="color: {COLORS["success"]}; font-size: 11px;">(mostly solar-powered)</span>'
-            opp_items += f"""
-            <div style="padding: 10px; border-bottom: 1px solid {COLORS['light']};">
+                coverage = f' <span style="color: {c_success}; font-size: 11px;">(mostly solar-powered)</span>'
+            opp_parts.append(f"""
+            <div style="padding: 10px; border-bottom: 1px solid {c_light};">
                 <table style="width: 100%;"><tr>
                     <td>
-                        <div style="font-weight: 600; color: {COLORS['dark']};">{opp['name']}</div>
-                        <div style="font-size: 12px; color: {COLORS['muted']};">{opp['peak_pct']:.0f}% during peak{coverage}</div>
+                        <div style="font-weight: 600; color: {c_dark};">{opp['name']}</div>
+                        <div style="font-size: 12px; color: {c_muted};">{opp['peak_pct']:.0f}% during peak{coverage}</div>
                     </td>
                     <td style="text-align: right;">
-                        <div style="font-weight: 700; color: {COLORS['success']};">{format_currency(opp['savings'])}/wk</div>
-                        <div style="font-size: 11px; color: {COLORS['muted']};">if shifted off-peak</div>
+                        <div style="font-weight: 700; color: {c_success};">{format_currency(opp['savings'])}/wk</div>
+                        <div style="font-size: 11px; color: {c_muted};">if shifted off-peak</div>
                     </td>
                 </tr></table>
             </div>
-            """
+            """)
+
+        opp_items = "".join(opp_parts)
 
         opps_html = f"""
         <div style="margin: 24px 0;">
-            <h3 style="color: {COLORS['dark']}; margin-bottom: 12px;">&#128161; Savings Opportunities</h3>
-            <div style="border: 1px solid {COLORS['light']}; border-radius: 8px; overflow: hidden;">
+            <h3 style="color: {c_dark}; margin-bottom: 12px;">&#128161; Savings Opportunities</h3>
+            <div style="border: 1px solid {c_light}; border-radius: 8px; overflow: hidden;">
                 {opp_items}
             </div>
         </div>
@@ -291,21 +350,21 @@ def generate_html_report(
         cost_arrow, cost_color, cost_label = get_trend_indicator(cost_change_pct)
 
         trend_html = f"""
-        <div style="background: {COLORS['light']}; border-radius: 8px; padding: 16px; margin: 16px 0;">
-            <h3 style="margin: 0 0 12px 0; color: {COLORS['dark']};">Week-over-Week Trend</h3>
+        <div style="background: {c_light}; border-radius: 8px; padding: 16px; margin: 16px 0;">
+            <h3 style="margin: 0 0 12px 0; color: {c_dark};">Week-over-Week Trend</h3>
             <table style="width: 100%;">
                 <tr>
                     <td style="text-align: center; padding: 8px;">
                         <div style="font-size: 24px; color: {kwh_color};">{kwh_arrow}</div>
                         <div style="font-size: 18px; font-weight: bold; color: {kwh_color};">{kwh_label}</div>
-                        <div style="color: {COLORS['muted']}; font-size: 12px;">Energy</div>
-                        <div style="font-size: 11px; color: {COLORS['muted']};">{format_kwh(prev_kwh)} → {format_kwh(total_kwh)} kWh</div>
+                        <div style="color: {c_muted}; font-size: 12px;">Energy</div>
+                        <div style="font-size: 11px; color: {c_muted};">{format_kwh(prev_kwh)} → {format_kwh(total_kwh)} kWh</div>
                     </td>
                     <td style="text-align: center; padding: 8px;">
                         <div style="font-size: 24px; color: {cost_color};">{cost_arrow}</div>
                         <div style="font-size: 18px; font-weight: bold; color: {cost_color};">{cost_label}</div>
-                        <div style="color: {COLORS['muted']}; font-size: 12px;">Cost</div>
-                        <div style="font-size: 11px; color: {COLORS['muted']};">{format_currency(prev_cost)} → {format_currency(total_cost)}</div>
+                        <div style="color: {c_muted}; font-size: 12px;">Cost</div>
+                        <div style="font-size: 11px; color: {c_muted};">{format_currency(prev_cost)} → {format_currency(total_cost)}</div>
                     </td>
                 </tr>
             </table>
@@ -325,29 +384,30 @@ def generate_html_report(
         _, cost_color, _ = get_trend_indicator(cost_vs_avg)
 
         historical_html = f"""
-        <div style="background: {COLORS['white']}; border: 1px solid {COLORS['light']}; border-radius: 8px; padding: 12px; margin: 16px 0;">
-            <div style="font-size: 12px; color: {COLORS['muted']};">vs 30-Day Average</div>
+        <div style="background: {c_white}; border: 1px solid {c_light}; border-radius: 8px; padding: 12px; margin: 16px 0;">
+            <div style="font-size: 12px; color: {c_muted};">vs 30-Day Average</div>
             <div style="display: flex; justify-content: space-around; margin-top: 8px;">
                 <div style="text-align: center;">
                     <span style="font-weight: bold; color: {kwh_color};">{kwh_vs_avg:+.1f}%</span>
-                    <span style="color: {COLORS['muted']}; font-size: 12px;"> energy</span>
+                    <span style="color: {c_muted}; font-size: 12px;"> energy</span>
                 </div>
                 <div style="text-align: center;">
                     <span style="font-weight: bold; color: {cost_color};">{cost_vs_avg:+.1f}%</span>
-                    <span style="color: {COLORS['muted']}; font-size: 12px;"> cost</span>
+                    <span style="color: {c_muted}; font-size: 12px;"> cost</span>
                 </div>
             </div>
         </div>
         """
 
     # Build register rows — show grid cost when solar data available
-    register_rows = ""
+    register_row_parts = []
+    peak_alerts = []
     display_total_cost = sol_net if solar_system else total_cost
     for i, (register, stats) in enumerate(sorted_registers):
         name = register.replace(' [kWh]', '')
 
         # Determine row color based on position
-        row_bg = COLORS['white'] if i % 2 == 0 else COLORS['light']
+        row_bg = c_white if i % 2 == 0 else c_light
 
         # Use grid cost when solar data available
         circuit_cost = stats['total_cost']
@@ -374,63 +434,45 @@ def generate_html_report(
 
         # Color coding based on grid peak (what actually costs money)
         if grid_peak_pct > HIGH_PEAK_USAGE_PERCENT:
-            peak_color = COLORS['danger']
+            peak_color = c_danger
             peak_status = '⚠️'
         elif grid_peak_pct > HIGH_PEAK_USAGE_PERCENT * 0.7:
-            peak_color = COLORS['warning']
+            peak_color = c_warning
             peak_status = ''
         else:
-            peak_color = COLORS['success']
+            peak_color = c_success
             peak_status = '✓'
 
         # Progress bar for cost
         bar_width = min(cost_pct * 2, 100)  # Scale for visibility
-        bar_color = COLORS['danger'] if cost_pct > 25 else COLORS['warning'] if cost_pct > 10 else COLORS['primary']
+        bar_color = c_danger if cost_pct > 25 else c_warning if cost_pct > 10 else c_primary
 
-        register_rows += f"""
+        register_row_parts.append(f"""
         <tr style="background: {row_bg};">
-            <td style="padding: 12px; border-bottom: 1px solid {COLORS['light']};">
-                <div style="font-weight: 600; color: {COLORS['dark']};">{name}</div>
-                <div style="height: 4px; background: {COLORS['light']}; border-radius: 2px; margin-top: 4px;">
+            <td style="padding: 12px; border-bottom: 1px solid {c_light};">
+                <div style="font-weight: 600; color: {c_dark};">{name}</div>
+                <div style="height: 4px; background: {c_light}; border-radius: 2px; margin-top: 4px;">
                     <div style="height: 4px; background: {bar_color}; border-radius: 2px; width: {bar_width}%;"></div>
                 </div>
             </td>
-            <td style="padding: 12px; text-align: right; border-bottom: 1px solid {COLORS['light']};">
+            <td style="padding: 12px; text-align: right; border-bottom: 1px solid {c_light};">
                 <div style="font-weight: 600;">{format_currency(circuit_cost)}</div>
-                <div style="font-size: 11px; color: {COLORS['muted']};">{format_currency(circuit_daily_cost)}/day</div>
+                <div style="font-size: 11px; color: {c_muted};">{format_currency(circuit_daily_cost)}/day</div>
             </td>
-            <td style="padding: 12px; text-align: right; border-bottom: 1px solid {COLORS['light']};">
+            <td style="padding: 12px; text-align: right; border-bottom: 1px solid {c_light};">
                 <div>{format_kwh(stats['total_kwh'])} kWh</div>
-                <div style="font-size: 11px; color: {COLORS['muted']};">{format_kwh(stats['avg_daily_kwh'])}/day</div>
+                <div style="font-size: 11px; color: {c_muted};">{format_kwh(stats['avg_daily_kwh'])}/day</div>
             </td>
-            <td style="padding: 12px; text-align: center; border-bottom: 1px solid {COLORS['light']};">
+            <td style="padding: 12px; text-align: center; border-bottom: 1px solid {c_light};">
                 <span style="color: {peak_color}; font-weight: 600;">{peak_pct:.0f}%</span>
-                {'<span style="color: ' + COLORS['success'] + '; font-size: 11px;" title="Battery covers peak">&#9889;</span>' if battery_covers_peak else '<span style="font-size: 12px;">' + peak_status + '</span>'}
+                {'<span style="color: ' + c_success + '; font-size: 11px;" title="Battery covers peak">&#9889;</span>' if battery_covers_peak else '<span style="font-size: 12px;">' + peak_status + '</span>'}
             </td>
         </tr>
-        """
-
-    # Build alerts section
-    alerts_html = ""
-    alerts = []
-
-    # Check furnace
-    furnace_key = 'CT 14 - Furnace [kWh]'
-    if furnace_key in register_stats:
-        furnace_daily = register_stats[furnace_key]['avg_daily_kwh']
-        if furnace_daily > FURNACE_DAILY_THRESHOLD_KWH:
-            alerts.append({
-                'type': 'danger',
-                'icon': '🔥',
-                'title': 'Furnace High Usage',
-                'message': f'{furnace_daily:.1f} kWh/day (threshold: {FURNACE_DAILY_THRESHOLD_KWH})',
-            })
+        """)
 
-    # Check peak usage (source-aware when solar data available)
-    for register, stats in sorted_registers[:5]:
-        peak_pct = stats['by_tou']['peak']['percent']
-        if peak_pct > HIGH_PEAK_USAGE_PERCENT:
-            name = register.replace(' [kWh]', '')
+        # Peak usage alert for the top five circuits (source-aware when
+        # solar data available)
+        if i < 5 and peak_pct > HIGH_PEAK_USAGE_PERCENT:
             # Check if solar/battery covers this circuit's peak usage
             covered = False
             if solar_register_stats and register in solar_register_stats:
@@ -441,74 +483,84 @@ def generate_html_report(
                 if sr_peak_total > 0 and sr_peak_grid / sr_peak_total < 0.4:
                     covered = True
             if covered:
-                alerts.append({
+                peak_alerts.append({
                     'type': 'covered',
                     'icon': '✓',
                     'title': f'{name}: Peak Covered by Solar/Battery',
                     'message': f'{peak_pct:.1f}% during peak — mostly solar/battery powered',
                 })
             else:
-                alerts.append({
+                peak_alerts.append({
                     'type': 'warning',
                     'icon': '⚡',
                     'title': f'{name}: High Peak Usage',
                     'message': f'{peak_pct:.1f}% during peak hours ({format_currency(stats["by_tou"]["peak"]["cost"])})',
                 })
 
+    register_rows = "".join(register_row_parts)
+
+    # Build alerts section
+    alerts_html = ""
+    alerts = []
+
+    # Check furnace
+    furnace_key = 'CT 14 - Furnace [kWh]'
+    if furnace_key in register_stats:
+        furnace_daily = register_stats[furnace_key]['avg_daily_kwh']
+        if furnace_daily > FURNACE_DAILY_THRESHOLD_KWH:
+            alerts.append({
+                'type': 'danger',
+                'icon': '🔥',
+                'title': 'Furnace High Usage',
+                'message': f'{furnace_daily:.1f} kWh/day (threshold: {FURNACE_DAILY_THRESHOLD_KWH})',
+            })
+
+    # Peak usage alerts were collected while building the register rows
+    alerts.extend(peak_alerts)
+
     if alerts:
-        alerts_items = ""
+        alert_parts = []
         for alert in alerts:
-            bg_color = COLORS['danger'] if alert['type'] == 'danger' else COLORS['success'] if alert['type'] == 'covered' else COLORS['warning']
-            alerts_items += f"""
+            bg_color = c_danger if alert['type'] == 'danger' else c_success if alert['type'] == 'covered' else c_warning
+            alert_parts.append(f"""
             <div style="background: {bg_color}15; border-left: 4px solid {bg_color}; padding: 12px; margin: 8px 0; border-radius: 0 4px 4px 0;">
                 <div style="font-weight: 600; color: {bg_color};">{alert['icon']} {alert['title']}</div>
-                <div style="color: {COLORS['dark']}; font-size: 13px;">{alert['message']}</div>
+                <div style="color: {c_dark}; font-size: 13px;">{alert['message']}</div>
             </div>
-            """
+            """)
+
+        alerts_items = "".join(alert_parts)
 
         alerts_html = f"""
         <div style="margin: 24px 0;">
-            <h3 style="color: {COLORS['dark']}; margin-bottom: 12px;">⚠️ Alerts</h3>
+            <h3 style="color: {c_dark}; margin-bottom: 12px;">⚠️ Alerts</h3>
             {alerts_items}
         </div>
         """
     else:
-        alerts_html = f"""
-        <div style="background: {COLORS['success']}15; border-left: 4px solid {COLORS['success']}; padding: 12px; margin: 24px 0; border-radius: 0 4px 4px 0;">
-            <div style="font-weight: 600; color: {COLORS['success']};">✓ All Clear</div>
-            <div style="color: {COLORS['dark']}; font-size: 13px;">No alerts - consumption within normal parameters</div>
-        </div>
-        """
+        alerts_html = _ALL_CLEAR_HTML
 
     # TOU breakdown summary
-    total_peak_kwh = sum(s['by_tou']['peak']['kwh'] for s in register_stats.values())
-    total_part_peak_kwh = sum(s['by_tou']['part_peak']['kwh'] for s in register_stats.values())
-    total_off_peak_kwh = sum(s['by_tou']['off_peak']['kwh'] for s in register_stats.values())
-
-    total_peak_cost = sum(s['by_tou']['peak']['cost'] for s in register_stats.values())
-    total_part_peak_cost = sum(s['by_tou']['part_peak']['cost'] for s in register_stats.values())
-    total_off_peak_cost = sum(s['by_tou']['off_peak']['cost'] for s in register_stats.values())
-
     peak_pct = (total_peak_kwh / total_kwh * 100) if total_kwh > 0 else 0
     part_peak_pct = (total_part_peak_kwh / total_kwh * 100) if total_kwh > 0 else 0
     off_peak_pct = (total_off_peak_kwh / total_kwh * 100) if total_kwh > 0 else 0
 
     # Determine if TOU distribution is good
-    off_peak_status_color = COLORS['success'] if off_peak_pct > 60 else COLORS['warning'] if off_peak_pct > 40 else COLORS['danger']
+    off_peak_status_color = c_success if off_peak_pct > 60 else c_warning if off_peak_pct > 40 else c_danger
 
     tou_html = f"""
     <div style="margin: 24px 0;">
-        <h3 style="color: {COLORS['dark']}; margin-bottom: 12px;">Time-of-Use Distribution</h3>
+        <h3 style="color: {c_dark}; margin-bottom: 12px;">Time-of-Use Distribution</h3>
         <div style="display: flex; height: 24px; border-radius: 4px; overflow: hidden; margin-bottom: 8px;">
-            <div style="width: {off_peak_pct}%; background: {COLORS['off_peak']};" title="Off-Peak"></div>
-            <div style="width: {part_peak_pct}%; background: {COLORS['part_peak']};" title="Part-Peak"></div>
-            <div style="width: {peak_pct}%; background: {COLORS['peak']};" title="Peak"></div>
+            <div style="width: {off_peak_pct}%; background: {c_off_peak};" title="Off-Peak"></div>
+            <div style="width: {part_peak_pct}%; background: {c_part_peak};" title="Part-Peak"></div>
+            <div style="width: {peak_pct}%; background: {c_peak};" title="Peak"></div>
         </div>
         <table style="width: 100%; font-size: 13px;">
             <tr>
                 <td style="padding: 4px;">
-                    <span style="display: inline-block; width: 12px; height: 12px; background: {COLORS['off_peak']}; border-radius: 2px; margin-right: 4px;"></span>
-                    Off-Peak <span style="color: {COLORS['muted']};">(12am-3pm)</span>
+                    <span style="display: inline-block; width: 12px; height: 12px; background: {c_off_peak}; border-radius: 2px; margin-right: 4px;"></span>
+                    Off-Peak <span style="color: {c_muted};">(12am-3pm)</span>
                 </td>
                 <td style="text-align: right; color: {off_peak_status_color}; font-weight: 600;">{off_peak_pct:.1f}%</td>
                 <td style="text-align: right;">{format_kwh(total_off_peak_kwh)} kWh</td>
@@ -516,8 +568,8 @@ def generate_html_report(
             </tr>
             <tr>
                 <td style="padding: 4px;">
-                    <span style="display: inline-block; width: 12px; height: 12px; background: {COLORS['part_peak']}; border-radius: 2px; margin-right: 4px;"></span>
-                    Part-Peak <span style="color: {COLORS['muted']};">(3-4pm, 9pm-12am)</span>
+                    <span style="display: inline-block; width: 12px; height: 12px; background: {c_part_peak}; border-radius: 2px; margin-right: 4px;"></span>
+                    Part-Peak <span style="color: {c_muted};">(3-4pm, 9pm-12am)</span>
                 </td>
                 <td style="text-align: right;">{part_peak_pct:.1f}%</td>
                 <td style="text-align: right;">{format_kwh(total_part_peak_kwh)} kWh</td>
@@ -525,10 +577,10 @@ def generate_html_report(
             </tr>
             <tr>
                 <td style="padding: 4px;">
-                    <span style="display: inline-block; width: 12px; height: 12px; background: {COLORS['peak']}; border-radius: 2px; margin-right: 4px;"></span>
-                    Peak <span style="color: {COLORS['muted']};">(4-9pm)</span>
+                    <span style="display: inline-block; width: 12px; height: 12px; background: {c_peak}; border-radius: 2px; margin-right: 4px;"></span>
+                    Peak <span style="color: {c_muted};">(4-9pm)</span>
                 </td>
-                <td style="text-align: right; color: {COLORS['peak'] if peak_pct > 30 else COLORS['dark']};">{peak_pct:.1f}%</td>
+                <td style="text-align: right; color: {c_peak if peak_pct > 30 else c_dark};">{peak_pct:.1f}%</td>
                 <td style="text-align: right;">{format_kwh(total_peak_kwh)} kWh</td>
                 <td style="text-align: right;">{format_currency(total_peak_cost)}</td>
             </tr>
@@ -537,19 +589,9 @@ def generate_html_report(
     """
 
     # Build complete HTML
-    html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>eGauge Energy Report</title>
-</head>
-<body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; line-height: 1.5; color: {COLORS['dark']}; background: {COLORS['light']}; margin: 0; padding: 20px;">
-    <div style="max-width: 600px; margin: 0 auto; background: {COLORS['white']}; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); overflow: hidden;">
-
+    html = f"""{_REPORT_HEAD}
         <!-- Header -->
-        <div style="background: linear-gradient(135deg, {COLORS['primary']}, #1d4ed8); color: white; padding: 24px; text-align: center;">
+        <div style="background: linear-gradient(135deg, {c_primary}, #1d4ed8); color: white; padding: 24px; text-align: center;">
             <h1 style="margin: 0; font-size: 24px;">⚡ Energy Report {grade_html}</h1>
             <div style="opacity: 0.9; font-size: 14px; margin-top: 4px;">Last {days} Days</div>
             <div style="opacity: 0.7; font-size: 12px; margin-top: 2px;">{datetime.now().strftime('%B %d, %Y')}</div>
@@ -557,20 +599,20 @@ def generate_html_report(
 
         <!-- Summary Cards -->
         <div style="padding: 20px; display: flex; gap: 12px;">
-            <div style="flex: 1; background: {COLORS['light']}; border-radius: 8px; padding: 16px; text-align: center;">
-                <div style="font-size: 28px; font-weight: 700; color: {COLORS['primary']};">{format_currency(sol_net)}</div>
-                <div style="color: {COLORS['muted']}; font-size: 12px;">{'Net Grid Cost' if solar_system else 'Total Cost'}</div>
-                <div style="font-size: 11px; color: {COLORS['muted']}; margin-top: 4px;">{format_currency(sol_net / days)}/day</div>
+            <div style="flex: 1; background: {c_light}; border-radius: 8px; padding: 16px; text-align: center;">
+                <div style="font-size: 28px; font-weight: 700; color: {c_primary};">{format_currency(sol_net)}</div>
+                <div style="color: {c_muted}; font-size: 12px;">{'Net Grid Cost' if solar_system else 'Total Cost'}</div>
+                <div style="font-size: 11px; color: {c_muted}; margin-top: 4px;">{format_currency(sol_net / days)}/day</div>
             </div>
-            <div style="flex: 1; background: {COLORS['light']}; border-radius: 8px; padding: 16px; text-align: center;">
-                <div style="font-size: 28px; font-weight: 700; color: {COLORS['dark']};">{format_kwh(total_kwh)}</div>
-                <div style="color: {COLORS['muted']}; font-size: 12px;">Total kWh</div>
-                <div style="font-size: 11px; color: {COLORS['muted']}; margin-top: 4px;">{format_kwh(avg_daily_kwh)}/day</div>
+            <div style="flex: 1; background: {c_light}; border-radius: 8px; padding: 16px; text-align: center;">
+                <div style="font-size: 28px; font-weight: 700; color: {c_dark};">{format_kwh(total_kwh)}</div>
+                <div style="color: {c_muted}; font-size: 12px;">Total kWh</div>
+                <div style="font-size: 11px; color: {c_muted}; margin-top: 4px;">{format_kwh(avg_daily_kwh)}/day</div>
             </div>
-            <div style="flex: 1; background: {COLORS['light']}; border-radius: 8px; padding: 16px; text-align: center;">
-                <div style="font-size: 28px; font-weight: 700; color: {'#eab308' if sol_self_suff > 20 else COLORS['muted']};">{sol_self_suff:.0f}%</div>
-                <div style="color: {COLORS['muted']}; font-size: 12px;">Self-Sufficiency</div>
-                <div style="font-size: 11px; color: {COLORS['muted']}; margin-top: 4px;">{format_kwh(sol_consumption - sol_grid_in)} non-grid</div>
+            <div style="flex: 1; background: {c_light}; border-radius: 8px; padding: 16px; text-align: center;">
+                <div style="font-size: 28px; font-weight: 700; color: {'#eab308' if sol_self_suff > 20 else c_muted};">{sol_self_suff:.0f}%</div>
+                <div style="color: {c_muted}; font-size: 12px;">Self-Sufficiency</div>
+                <div style="font-size: 11px; color: {c_muted}; margin-top: 4px;">{format_kwh(sol_consumption - sol_grid_in)} non-grid</div>
             </div>
         </div>
 
@@ -594,10 +636,10 @@ def generate_html_report(
 
         <!-- Register Table -->
         <div style="padding: 20px;">
-            <h3 style="color: {COLORS['dark']}; margin-bottom: 12px;">Consumption by Circuit</h3>
+            <h3 style="color: {c_dark}; margin-bottom: 12px;">Consumption by Circuit</h3>
             <table style="width: 100%; border-collapse: collapse; font-size: 13px;">
                 <thead>
-                    <tr style="background: {COLORS['dark']}; color: white;">
+                    <tr style="background: {c_dark}; color: white;">
                         <th style="padding: 10px; text-align: left; border-radius: 4px 0 0 0;">Circuit</th>
                         <th style="padding: 10px; text-align: right;">{"Grid Cost" if solar_register_stats else "Cost"}</th>
                         <th style="padding: 10px; text-align: right;">Energy</th>
@@ -615,16 +657,7 @@ def generate_html_report(
             {tou_html}
         </div>
 
-        <!-- Footer -->
-        <div style="background: {COLORS['light']}; padding: 16px 20px; text-align: center; font-size: 11px; color: {COLORS['muted']};">
-            <div>Generated by eGauge Energy Analysis Toolkit</div>
-            <div style="margin-top: 4px;">Peak: 4-9pm | Part-Peak: 3-4pm, 9pm-12am | Off-Peak: 12am-3pm</div>
-            <div style="margin-top: 8px;"><a href="https://energy.zosia.io" style="color: {COLORS['primary']}; text-decoration: none;">View Live Dashboard &rarr;</a></div>
-        </div>
-    </div>
-</body>
-</html>
-"""
+{_REPORT_FOOTER}"""
 
     return html
 
@@ -637,14 +670,19 @@ def generate_html_alert(
 ) -> str:
     """Generate a simple HTML alert email."""
 
+    c_muted = COLORS['muted']
+    c_light = COLORS['light']
+    c_dark = COLORS['dark']
+
     color = COLORS.get(alert_type, COLORS['warning'])
     icon = '🔥' if alert_type == 'danger' else '⚠️' if alert_type == 'warning' else 'ℹ️'
 
     details_html = ""
     if details:
-        details_rows = ""
+        detail_parts = []
         for key, value in details.items():
-            details_rows += f"<tr><td style='padding: 4px 8px; color: {COLORS['muted']};'>{key}</td><td style='padding: 4px 8px; font-weight: 600;'>{value}</td></tr>"
+            detail_parts.append(f"<tr><td style='padding: 4px 8px; color: {c_muted};'>{key}</td><td style='padding: 4px 8px; font-weight: 600;'>{value}</td></tr>")
+        details_rows = "".join(detail_parts)
         details_html = f"""
         <table style="margin-top: 12px; font-size: 13px;">
             {details_rows}
@@ -658,17 +696,17 @@ def generate_html_alert(
     <meta charset="utf-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
 </head>
-<body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; margin: 0; padding: 20px; background: {COLORS['light']};">
+<body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; margin: 0; padding: 20px; background: {c_light};">
     <div style="max-width: 500px; margin: 0 auto; background: white; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
         <div style="background: {color}; color: white; padding: 16px; text-align: center;">
             <div style="font-size: 32px;">{icon}</div>
             <h2 style="margin: 8px 0 0 0;">{subject}</h2>
         </div>
         <div style="padding: 20px;">
-            <p style="margin: 0; color: {COLORS['dark']};">{message}</p>
+            <p style="margin: 0; color: {c_dark};">{message}</p>
             {details_html}
         </div>
-        <div style="background: {COLORS['light']}; padding: 12px; text-align: center; font-size: 11px; color: {COLORS['muted']};">
+        <div style="background: {c_light}; padding: 12px; text-align: center; font-size: 11px; color: {c_muted};">
             eGauge Energy Analysis Toolkit
         </div>
     </div>
@@ -386,7 +386,7 @@ def predict_loads(
       daytime_kwh, overnight_kwh, peak_kwh: aggregates (incl EV)
                        — informational only
     """
-    import sqlite3, json
+    import sqlite3
     from pathlib import Path
     from datetime import datetime, timedelta
 
@@ -415,10 +415,14 @@ def predict_loads(
     cutoff_ts = int((datetime.now() - timedelta(days=lookback_days)).timestamp())
     conn = sqlite3.connect(str(db))
     rows = conn.execute(
-        """SELECT hc.date, hc.hour, hc.register_data FROM hourly_consumption hc
+        """SELECT hc.timestamp, hc.date, hc.hour, r.name, rr.kwh
+           FROM hourly_consumption hc
+           LEFT JOIN register_readings rr ON rr.timestamp = hc.timestamp
+           LEFT JOIN registers r ON r.id = rr.register_id
            WHERE hc.timestamp >= ?
            AND hc.timestamp = (SELECT MAX(timestamp) FROM hourly_consumption
-                               WHERE date = hc.date AND hour = hc.hour)""",
+                               WHERE date = hc.date AND hour = hc.hour)
+           ORDER BY hc.timestamp""",
         (cutoff_ts,),
     ).fetchall()
     conn.close()
@@ -426,12 +430,22 @@ def predict_loads(
     if not rows:
         return fallback
 
+    # One row per reading; regroup into (date, hour, {register: kwh}) per hour
+    hours = []
+    last_ts = None
+    for ts, date_str, hour, name, kwh in rows:
+        if ts != last_ts:
+            registers = {}
+            hours.append((date_str, hour, registers))
+            last_ts = ts
+        if name is not None:
+            registers[name] = kwh
+
     # weight=2.0 for same-weekday-bucket as target, weight=1.0 for others
     weighted_total = {h: [] for h in range(24)}  # list of (kwh, weight)
     weighted_ev = {h: [] for h in range(24)}
-    for date_str, hour, register_json in rows:
+    for date_str, hour, registers in hours:
         try:
-            registers = json.loads(register_json)
             d = datetime.strptime(date_str, "%Y-%m-%d").date()
         except Exception:
             continue
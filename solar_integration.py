@@ -22,6 +22,13 @@ from collections import defaultdict
 
 from config import get_tou_period, get_rate, is_summer, is_solar_enabled, get_config
 
+# HA /api/states and /api/history responses can be megabytes; parse them with
+# orjson when it is installed (the dashboard image has it)
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 # ==========================================
 # Home Assistant Configuration (from config.yml)
 # ==========================================
@@ -55,6 +62,8 @@ def get_ha_token():
 # Module-level references for backward compatibility (used by app.py imports)
 HA_URL = os.environ.get("HA_URL", "http://homeassistant.local:8123")
 HA_ENTITIES = _get_ha_entities() if is_solar_enabled() else {}
+# Inverse lookup (entity_id -> key) for scanning HA /api/states responses
+HA_ENTITY_TO_KEY = {entity_id: key for key, entity_id in HA_ENTITIES.items()}
 
 # NEM 2.0 export credits — backward-compat module-level exports
 _credits = _get_export_credits() if is_solar_enabled() else {}
@@ -122,7 +131,7 @@ def fetch_ha_history(entity_id, days=7):
         result = subprocess.run(
             cmd, capture_output=True, text=True, check=True, timeout=60
         )
-        data = json.loads(result.stdout)
+        data = _json_loads(result.stdout)
         if data and len(data) > 0:
             return data[0]
         return []
@@ -144,22 +153,24 @@ def fetch_ha_current():
     if not token:
         return None
 
-    ha_entities = _get_ha_entities()
     cmd = ["curl", "-s", "-H", f"Authorization: Bearer {token}", f"{HA_URL}/api/states"]
 
     try:
         result = subprocess.run(
             cmd, capture_output=True, text=True, check=True, timeout=15
         )
-        states = json.loads(result.stdout)
+        states = _json_loads(result.stdout)
         current = {}
         for state in states:
-            for key, entity_id in ha_entities.items():
-                if state["entity_id"] == entity_id:
-                    try:
-                        current[key] = float(state["state"])
-                    except (ValueError, TypeError):
-                        current[key] = 0.0
+            key = HA_ENTITY_TO_KEY.get(state["entity_id"])
+            if key is None:
+                continue
+            try:
+                current[key] = float(state["state"])
+            except (ValueError, TypeError):
+                current[key] = 0.0
+            if len(current) == len(HA_ENTITY_TO_KEY):
+                break  # every configured entity found; skip the rest
         return current
     except (
         subprocess.CalledProcessError,
@@ -840,6 +851,9 @@ def generate_solar_report(register_stats, system, days):
     report.append("TIME-SHIFTING OPPORTUNITIES (move to off-peak or solar hours)")
     report.append("-" * 110)
 
+    # Savings if shifted to off-peak using actual config rates
+    now = datetime.now()
+    rate_delta = get_rate(now, "peak") - get_rate(now, "off_peak")
     for register, stats in sorted_registers[:8]:
         name = register.replace(" [kWh]", "")
         peak = stats["by_tou"]["peak"]
@@ -847,10 +861,7 @@ def generate_solar_report(register_stats, system, days):
             peak_pct = (
                 peak["kwh"] / stats["total_kwh"] * 100 if stats["total_kwh"] > 0 else 0
             )
-            # Savings if shifted to off-peak using actual config rates
-            peak_rate = get_rate(datetime.now(), "peak")
-            offpeak_rate = get_rate(datetime.now(), "off_peak")
-            savings = peak["grid_kwh"] * (peak_rate - offpeak_rate)
+            savings = peak["grid_kwh"] * rate_delta
             if savings > 0.50:
                 report.append(
                     f"  {name:<38} Peak: {peak['kwh']:>6.1f} kWh ({peak_pct:>4.1f}%) "
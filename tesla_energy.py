@@ -11,7 +11,7 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 from pathlib import Path
 
-from config import get_tou_period, get_config
+from config import HOUR_TO_TOU, get_config
 from solar_integration import HA_URL, get_ha_token
 
 
@@ -167,7 +167,7 @@ def fetch_tesla_energy(days=30):
 
         day_key = dt.strftime('%Y-%m-%d')
         hour = dt.hour
-        tou = get_tou_period(hour)
+        tou = HOUR_TO_TOU[hour]
 
         # All Tesla values are in Wh, convert to kWh
         gi = entry.get('consumer_energy_imported_from_grid', 0) / 1000
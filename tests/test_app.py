@@ -1,5 +1,7 @@
 """Smoke tests for the FastAPI app — endpoints register and respond
 without crashing on import."""
+import asyncio
+
 import pytest
 
 try:
@@ -19,6 +21,16 @@ def test_config_endpoint():
     assert "plan_name" in body
 
 
+def test_dashboard_page_etag():
+    r = client.get("/")
+    assert r.status_code == 200
+    etag = r.headers.get("etag")
+    if etag is None:
+        pytest.skip("static/index.html not present")
+    r2 = client.get("/", headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+
+
 def test_health_endpoint_status():
     r = client.get("/api/health")
     # Health may return 200 or 503 depending on upstream — we just need it not to crash
@@ -33,3 +45,30 @@ def test_routes_registered():
     for p in ("/api/config", "/api/today", "/api/history", "/api/solar",
              "/api/energy-flows", "/api/battery/recommended-cap"):
         assert p in paths, f"route {p} not registered"
+
+
+class _FakeSocket:
+    def __init__(self, stall=False):
+        self.stall = stall
+        self.sent = []
+        self.close_code = None
+
+    async def send_text(self, text):
+        if self.stall:
+            await asyncio.sleep(3600)
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+def test_live_broadcast_closes_stalled_client():
+    """A client whose send stalls is dropped and its socket closed."""
+    ok, stalled = _FakeSocket(), _FakeSocket(stall=True)
+    app.connected_clients.update((ok, stalled))
+    try:
+        asyncio.run(app._send_live_frame("frame", timeout=0.05))
+    finally:
+        app.connected_clients.difference_update((ok, stalled))
+    assert ok.sent == ["frame"] and ok.close_code is None
+    assert stalled.close_code == 1011
@@ -1,7 +1,10 @@
 """Tests for config.py — TOU classification and rate lookup."""
 from datetime import date
 
-from config import get_rate, get_tou_period, is_summer, SUMMER_RATES, WINTER_RATES
+from config import (
+    get_rate, get_tou_period, is_summer, tou_table_for, HOUR_TO_TOU,
+    SUMMER_RATES, WINTER_RATES,
+)
 
 
 def test_tou_period_off_peak_morning():
@@ -22,6 +25,12 @@ def test_tou_period_partition():
         assert get_tou_period(h) in valid
 
 
+def test_hour_to_tou_matches_get_tou_period():
+    assert len(HOUR_TO_TOU) == 24
+    for h in range(24):
+        assert HOUR_TO_TOU[h] == get_tou_period(h)
+
+
 def test_get_rate_returns_positive_value():
     summer_day = date(2026, 7, 15)
     winter_day = date(2026, 1, 15)
@@ -42,3 +51,12 @@ def test_rate_table_complete():
         for tp in ("peak", "part_peak", "off_peak"):
             assert tp in tbl, f"{label} missing {tp}"
             assert tbl[tp] > 0
+
+
+def test_tou_table_matches_get_rate():
+    for d in (date(2026, 7, 15), date(2026, 1, 15)):
+        table = tou_table_for(d)
+        assert len(table) == 24
+        for h in range(24):
+            period = get_tou_period(h)
+            assert table[h] == (period, get_rate(d, period))
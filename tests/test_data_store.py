@@ -0,0 +1,117 @@
+"""Tests for data_store.py — register_readings storage and the migration
+from the old register_data JSON column."""
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import data_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """data_store pointed at an empty DATA_DIR with fresh connections."""
+    monkeypatch.setattr(data_store, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(data_store, "_conn", None)
+    monkeypatch.setattr(data_store, "_readers", threading.local())
+    monkeypatch.setattr(data_store, "_wal_enabled", False)
+    yield data_store
+    if data_store._conn is not None:
+        data_store._conn.close()
+    reader = getattr(data_store._readers, "conn", None)
+    if reader is not None:
+        reader.close()
+
+
+def _hour(dt, **registers):
+    return {
+        "datetime": dt,
+        "date": dt.date(),
+        "hour": dt.hour,
+        "tou_period": "off_peak",
+        **registers,
+    }
+
+
+def test_migrates_register_data_column(store, tmp_path):
+    """A database written with the register_data JSON column migrates
+    without losing readings or register order, and the column is dropped."""
+    day = datetime(2024, 1, 1)
+    old_rows = [
+        (day, {"Zeta [kWh]": 1.5, "Alpha [kWh]": 0.25}),
+        (day + timedelta(hours=1), {}),
+        (day + timedelta(hours=2), {"Alpha [kWh]": 0.5, "Mid [kWh]": 2.0}),
+    ]
+    conn = sqlite3.connect(tmp_path / "egauge_history.db")
+    conn.execute('''
+        CREATE TABLE hourly_consumption (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp INTEGER UNIQUE NOT NULL,
+            datetime TEXT NOT NULL,
+            date TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            tou_period TEXT NOT NULL,
+            register_data TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.executemany('''
+        INSERT INTO hourly_consumption
+        (timestamp, datetime, date, hour, tou_period, register_data)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', [
+        (int(dt.timestamp()), dt.isoformat(), str(dt.date()), dt.hour,
+         "off_peak", json.dumps(registers))
+        for dt, registers in old_rows
+    ])
+    conn.commit()
+    conn.close()
+
+    result = store.get_hourly_data(day, day + timedelta(days=1))
+
+    assert [r["datetime"] for r in result] == [dt for dt, _ in old_rows]
+    for row, (_, registers) in zip(result, old_rows):
+        readings = {k: v for k, v in row.items() if k.endswith("[kWh]")}
+        assert list(readings.items()) == list(registers.items())
+
+    with store._db() as conn:
+        columns = [r[1] for r in conn.execute("PRAGMA table_info(hourly_consumption)")]
+    assert "register_data" not in columns
+
+
+def test_store_and_get_hourly_data_round_trip(store):
+    day = datetime(2024, 3, 5)
+    hours = [
+        _hour(day, **{"Furnace [kWh]": 1.25, "Dryer [kWh]": 0.0}),
+        _hour(day + timedelta(hours=1)),
+        _hour(day + timedelta(hours=2), **{"Dryer [kWh]": 3.5}),
+    ]
+    store.store_hourly_data(hours)
+
+    result = store.get_hourly_data(day, day + timedelta(days=1))
+
+    assert len(result) == 3
+    for row, entry in zip(result, hours):
+        assert row["datetime"] == entry["datetime"]
+        assert row["date"] == str(entry["date"])
+        assert row["hour"] == entry["hour"]
+        assert row["tou_period"] == entry["tou_period"]
+        readings = {k: v for k, v in row.items() if k.endswith("[kWh]")}
+        assert readings == {k: v for k, v in entry.items() if k.endswith("[kWh]")}
+
+
+def test_cleanup_removes_old_register_readings(store):
+    recent = datetime.now().replace(minute=0, second=0, microsecond=0)
+    old = recent - timedelta(days=store.DATA_RETENTION_DAYS + 2)
+    store.store_hourly_data([
+        _hour(old, **{"Furnace [kWh]": 1.0}),
+        _hour(recent, **{"Furnace [kWh]": 2.0}),
+    ])
+
+    store.cleanup_old_data()
+
+    with store._db() as conn:
+        remaining = [r[0] for r in conn.execute("SELECT timestamp FROM register_readings")]
+    assert remaining == [int(recent.timestamp())]